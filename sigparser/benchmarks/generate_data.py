@@ -0,0 +1,186 @@
+# generate_data.py
+
+import argparse
+import os
+import zipfile
+from xml.sax.saxutils import escape
+import numpy as np
+import pandas as pd
+
+SIZES = {'1k': 1_000, '20k': 20_000, '100k': 100_000, '1m': 1_000_000}
+
+FIRST_NAMES = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'David', 'Susan',
+               "'Bob", '*Ann', '_Joe', "Tom'", '-Sue', "O'Neil", 'Zoë', ' Al ']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Wilson', 'Moore',
+              "Anderson'", "'Taylor", "O'Brien", 'Nguyen']
+COMPANIES = ['Stock & Associates', 'Acme Engineering', 'Cascade Surveying', 'Pacific Builders', 'Summit Design',
+             'Riverbend Homes', 'Northwest Utilities', '[No Name]']
+INDUSTRIES = ['Construction', 'Engineering', 'Real Estate', 'Government', 'Utilities']
+LOCATIONS = ['Portland, OR', 'Salem, OR', 'Vancouver, WA', 'Bend, OR', 'Seattle, WA']
+BOT_MAILBOXES = ['noreply', 'billing', 'support', 'invoices', 'do-not-reply']
+PROJECT_WORDS = ['Road', 'Bridge', 'Survey', 'Subdivision', 'Water Line', 'Parking Lot', 'School', 'Park']
+
+
+# Phone numbers in the mix of formats SigParser exports
+def phone_pool(rng, size):
+    digits = rng.integers(2_000_000_000, 9_999_999_999, size).astype(str)
+    area, prefix, line = (pd.Series(digits).str[a:b] for a, b in ((0, 3), (3, 6), (6, 10)))
+    formats = [
+        '(' + area + ') ' + prefix + '-' + line,
+        area + '-' + prefix + '-' + line,
+        area + '.' + prefix + '.' + line,
+        '+1 ' + area + ' ' + prefix + ' ' + line,
+        '1-' + area + '-' + prefix + '-' + line,
+        area + prefix + line + ' x12',
+    ]
+    choice = rng.integers(0, len(formats), size)
+    return np.select([choice == i for i in range(len(formats))], [f.to_numpy() for f in formats])
+
+
+# Sample phones from a pool, smaller pools give the repeated office and fax numbers seen in real exports
+def phones(rng, rows, pool_size, empty_rate):
+    pool = phone_pool(rng, pool_size)
+    values = pd.Series(pool[rng.integers(0, pool_size, rows)], dtype=object)
+    values[rng.random(rows) < empty_rate] = None
+    return values
+
+
+def random_dates(rng, rows, start='2020-01-01', days=2000):
+    return pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, rows), unit='D')
+
+
+# Contact ids with a share of rows repeated, like duplicate people in a SigParser export
+def record_ids(rng, rows, prefix, duplicate_rate):
+    unique = max(1, int(rows * (1 - duplicate_rate)))
+    ids = np.concatenate([np.arange(unique), rng.integers(0, unique, rows - unique)])
+    rng.shuffle(ids)
+    return prefix + pd.Series(ids).astype(str)
+
+
+def generate_contacts(rows, seed=0, duplicate_rate=0.03):
+    rng = np.random.default_rng(seed)
+    ids = record_ids(rng, rows, 'contact-', duplicate_rate)
+    first = pd.Series(rng.choice(FIRST_NAMES, rows))
+    last = pd.Series(rng.choice(LAST_NAMES, rows))
+    company = pd.Series(rng.choice(COMPANIES, rows))
+
+    email = first.str.strip(" '*_-").str.lower() + '.' + last.str.strip("'").str.lower() + ids.str[8:] + '@example.com'
+    bots = rng.random(rows) < 0.03
+    email[bots] = pd.Series(rng.choice(BOT_MAILBOXES, rows))[bots] + '@example.com'
+
+    return pd.DataFrame({
+        'SigParser Contact ID': ids,
+        'Name Prefix': None,
+        'First Name': first,
+        'Middle Name': np.where(rng.random(rows) < 0.2, 'J.', None),
+        'Last Name': last,
+        'Name Suffix': None,
+        'Full Name': first + ' ' + last,
+        'Company Name': company,
+        'Job Title': rng.choice(['Engineer', 'Surveyor', 'Project Manager', 'Owner'], rows),
+        'Email Address': email,
+        'Full Address': None,
+        'Home Phone': phones(rng, rows, max(1, rows // 2), 0.8),
+        'Office Phone': phones(rng, rows, max(1, rows // 50), 0.3),
+        'Direct Phone': phones(rng, rows, max(1, rows // 2), 0.6),
+        'Mobile Phone': phones(rng, rows, max(1, rows), 0.4),
+        'Fax Phone': phones(rng, rows, max(1, rows // 100), 0.7),
+        'Interaction Status': rng.choice(['Active', 'Inactive', 'Cold', ''], rows, p=[0.5, 0.3, 0.15, 0.05]),
+        'Latest Interaction': random_dates(rng, rows).strftime('%Y-%m-%d'),
+        'Contact Status': rng.choice(['Good', 'Bounced'], rows, p=[0.95, 0.05]),
+        'Date Last Updated (Details)': random_dates(rng, rows).strftime('%b %d %Y'),
+        'Total Emails': rng.integers(0, 200, rows),
+        'Email Validation': rng.choice(['Valid', 'Unknown'], rows),
+        'Email Address Type': rng.choice(['Person', 'Non-Person'], rows, p=[0.9, 0.1]),
+        'Email Includes Unsubscribe': rng.random(rows) < 0.1,
+        'Email Domain Type': rng.choice(['Business', 'Automated', 'Personal'], rows, p=[0.8, 0.05, 0.15]),
+    })
+
+
+def generate_companies(rows, seed=0, duplicate_rate=0.02):
+    rng = np.random.default_rng(seed)
+    ids = record_ids(rng, rows, 'company-', duplicate_rate)
+    name = pd.Series(rng.choice(COMPANIES, rows)) + ' ' + ids.str[8:]
+    domain = name.str.lower().str.replace(r'[^a-z0-9]+', '', regex=True) + '.com'
+
+    return pd.DataFrame({
+        'SigParser Company ID': ids,
+        'Company Name': name,
+        'Company Website': 'https://' + domain,
+        'Company LinkedIn': 'https://linkedin.com/company/' + ids,
+        'Company Industry': rng.choice(INDUSTRIES, rows),
+        'Email Domain': domain,
+        'Company Location': rng.choice(LOCATIONS, rows),
+        'Interaction Status': rng.choice(['Active', 'Inactive'], rows),
+        'Latest Interaction': random_dates(rng, rows).strftime('%Y-%m-%d'),
+        'Total Emails': rng.integers(0, 500, rows),
+        'Company Contacts': rng.integers(0, 40, rows),
+    })
+
+
+# Write a minimal .docx whose body is one project table with two projects per row
+def generate_project_list(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    job_nos = pd.Series(rng.integers(10_000, 99_999, rows)).astype(str) + '-' + pd.Series(np.arange(rows)).astype(str)
+    notes = rng.random(rows) < 0.1
+    job_nos[notes] = job_nos[notes] + ' see file'
+    descriptions = (pd.Series(rng.choice(PROJECT_WORDS, rows)) + ' at '
+                    + pd.Series(rng.choice(LOCATIONS, rows)))
+    confidential = rng.random(rows) < 0.05
+    descriptions[confidential] = 'Confidential - ' + descriptions[confidential]
+
+    w = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+    content_types = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                     '<Default Extension="xml" ContentType="application/xml"/>'
+                     '<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-'
+                     'officedocument.wordprocessingml.document.main+xml"/></Types>')
+    rels = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/'
+            'officeDocument" Target="word/document.xml"/></Relationships>')
+
+    def cell(text):
+        return f'<w:tc><w:p><w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p></w:tc>'
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', content_types)
+        archive.writestr('_rels/.rels', rels)
+        with archive.open('word/document.xml', 'w') as document:
+            document.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document xmlns:w="{w}">'
+                           '<w:body><w:tbl>'.encode())
+            for i in range(0, rows, 2):
+                pairs = zip(job_nos[i:i + 2], descriptions[i:i + 2])
+                document.write(('<w:tr>' + ''.join(cell(j) + cell(d) for j, d in pairs) + '</w:tr>').encode())
+            document.write(b'</w:tbl><w:sectPr/></w:body></w:document>')
+
+
+# Generate every dataset for one size label, skipping files that already exist
+def generate(size, data_dir, seed=0):
+    rows = SIZES[size]
+    os.makedirs(data_dir, exist_ok=True)
+    paths = {
+        'contacts': os.path.join(data_dir, f'Contacts_{size}.csv'),
+        'companies': os.path.join(data_dir, f'Companies_{size}.csv'),
+        'projects': os.path.join(data_dir, f'projectList_{size}.docx'),
+    }
+    if not os.path.exists(paths['contacts']):
+        generate_contacts(rows, seed).to_csv(paths['contacts'], index=False)
+    if not os.path.exists(paths['companies']):
+        generate_companies(rows, seed).to_csv(paths['companies'], index=False)
+    if not os.path.exists(paths['projects']):
+        generate_project_list(paths['projects'], rows, seed)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate synthetic SigParser exports and project lists')
+    parser.add_argument('sizes', nargs='*', default=['1k', '20k'], choices=list(SIZES))
+    parser.add_argument('--data-dir', default=os.path.join(os.path.dirname(__file__), 'data'))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for name, path in generate(size, args.data_dir, args.seed).items():
+            print(f'{name}: {path}')
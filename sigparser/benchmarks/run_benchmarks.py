@@ -0,0 +1,196 @@
+# run_benchmarks.py
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from contact_process import ContactConverter
+from company_process import CompanyConverter
+from jobList_process import ProjectListConverter
+from fake_supabase import FakeSupabase
+from upload_executor import AdaptiveBatcher
+from generate_data import SIZES, generate
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.jsonl')
+
+# A stage is only flagged when it is this much slower than the previous run and takes measurable time
+REGRESSION_RATIO = 1.25
+REGRESSION_MIN_SECONDS = 0.05
+
+
+class StageTimer:
+    def __init__(self, track_memory: bool):
+        self.track_memory = track_memory
+        self.stages = {}
+
+    # Time one pipeline stage and record its peak traced memory, converter output is silenced
+    @contextlib.contextmanager
+    def stage(self, name):
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+        result = {'seconds': round(time.perf_counter() - start, 4)}
+        if self.track_memory:
+            result['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        self.stages[name] = result
+
+
+def bench_contacts(path, timer, options):
+    converter = ContactConverter(path, 'benchmark.json', concurrency=options.concurrency, state_file=None, cache_dir=None)
+    return bench_csv(converter, path, timer, options)
+
+
+def bench_companies(path, timer, options):
+    converter = CompanyConverter(path, 'benchmark.json', concurrency=options.concurrency, state_file=None, cache_dir=None)
+    return bench_csv(converter, path, timer, options)
+
+
+# Time each step of CsvConverter.transform() on its own, cleaning the filtered rows like an import does
+def bench_csv(converter, path, timer, options):
+    converter.client = fake_backend(options)
+    converter.batcher = batcher(options)
+    with timer.stage('read'):
+        raw = pd.read_csv(path, low_memory=False, dtype=converter.csv_dtypes())
+    with timer.stage('filter'):
+        filtered = converter.apply_filters(raw)
+    # Converters that import every row only have their filters timed
+    data = filtered if converter.filter_rows else raw
+    with timer.stage('clean'):
+        data = converter.clean(data)
+    with timer.stage('dtypes'):
+        data = converter.compact(data)
+    with timer.stage('dedupe'):
+        data = converter.deduplicate(data)
+    upload(converter, data, timer, options)
+    return len(data)
+
+
+def bench_projects(path, timer, options):
+    converter = ProjectListConverter('benchmark.csv', 'benchmark.json', path, concurrency=options.concurrency, state_file=None, cache_dir=None)
+    converter.client = fake_backend(options)
+    converter.batcher = batcher(options)
+    with timer.stage('read'):
+        records = converter.process_docx()
+    with timer.stage('clean'):
+        data = converter.process_csv(records)
+    upload(converter, data, timer, options)
+    return len(data)
+
+
+# Adaptive batches are built while uploading, so serialize is then timed as part of upload
+def upload(converter, data, timer, options):
+    if options.adaptive:
+        with timer.stage('upload'):
+            converter.upload_to_supabase(converter.to_batches(data))
+        return
+    with timer.stage('serialize'):
+        batches = list(converter.to_batches(data))
+    with timer.stage('upload'):
+        converter.upload_to_supabase(iter(batches))
+
+
+# Fixed batch_size batches unless --adaptive lets the size follow payload bytes and latency
+def batcher(options):
+    if options.adaptive:
+        return AdaptiveBatcher(initial=options.batch_size)
+    return AdaptiveBatcher(initial=options.batch_size, min_size=options.batch_size, max_size=options.batch_size)
+
+
+# Fresh fake backend per benchmark with the requested round-trip cost and failure rate
+def fake_backend(options):
+    return FakeSupabase(latency=options.latency_ms / 1000, jitter=options.jitter_ms / 1000,
+                        failure_rate=options.failure_rate, seed=0)
+
+
+BENCHMARKS = {'contacts': bench_contacts, 'companies': bench_companies, 'projects': bench_projects}
+
+
+def current_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def load_history():
+    if not os.path.exists(HISTORY_FILE):
+        return []
+    with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# Compare each stage with the most recent earlier run of the same benchmark and settings
+def report_regressions(results, history, settings):
+    history = [run for run in history if all(run.get(key) == value for key, value in settings.items())]
+    regressions = 0
+    for name, result in results.items():
+        previous = next((run['results'][name] for run in reversed(history) if name in run['results']), None)
+        if previous is None:
+            continue
+        for stage, timing in result['stages'].items():
+            before = previous['stages'].get(stage, {}).get('seconds')
+            now = timing['seconds']
+            if before and now > before * REGRESSION_RATIO and now - before > REGRESSION_MIN_SECONDS:
+                regressions += 1
+                print(f"REGRESSION {name} {stage}: {before:.3f}s -> {now:.3f}s")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Time each converter stage against an in-process fake Supabase')
+    parser.add_argument('sizes', nargs='*', default=['1k', '20k'], choices=list(SIZES))
+    parser.add_argument('--converters', nargs='+', default=list(BENCHMARKS), choices=list(BENCHMARKS))
+    parser.add_argument('--data-dir', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--adaptive', action='store_true', help='Let the batch size adapt instead of fixing it')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Simulated round trip per Supabase request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Random extra latency per request')
+    parser.add_argument('--failure-rate', type=float, default=0, help='Share of requests that fail and are retried')
+    parser.add_argument('--no-memory', action='store_true', help='Skip tracemalloc, which slows every stage down')
+    parser.add_argument('--no-save', action='store_true', help='Do not append the results to history.jsonl')
+    args = parser.parse_args()
+
+    if not args.no_memory:
+        tracemalloc.start()
+
+    results = {}
+    for size in args.sizes:
+        paths = generate(size, args.data_dir)
+        for name in args.converters:
+            timer = StageTimer(track_memory=not args.no_memory)
+            rows = BENCHMARKS[name](paths[name], timer, args)
+            total = sum(stage['seconds'] for stage in timer.stages.values())
+            results[f'{name}/{size}'] = {'rows': rows, 'seconds': round(total, 4), 'stages': timer.stages}
+
+            stages = ', '.join(f"{stage} {timing['seconds']:.3f}s" for stage, timing in timer.stages.items())
+            peak = max((timing.get('peak_mb', 0) for timing in timer.stages.values()), default=0)
+            print(f"{name}/{size}: {rows} rows in {total:.3f}s ({stages})" + (f", peak {peak} MB" if peak else ''))
+
+    history = load_history()
+    settings = {'concurrency': args.concurrency, 'batch_size': args.batch_size, 'adaptive': args.adaptive,
+                'latency_ms': args.latency_ms,
+                'failure_rate': args.failure_rate, 'memory_traced': not args.no_memory}
+    regressions = report_regressions(results, history, settings)
+
+    if not args.no_save:
+        run = {'version': current_version(), 'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+               **settings, 'results': results}
+        with open(HISTORY_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run) + '\n')
+        print(f"Results appended to {HISTORY_FILE}")
+
+    sys.exit(1 if regressions else 0)
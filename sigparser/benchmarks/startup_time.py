@@ -0,0 +1,63 @@
+# startup_time.py
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SIGPARSER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of startup, they are only loaded once a file is processed
+HEAVY_MODULES = ['pandas', 'numpy', 'phonenumbers', 'supabase', 'httpx', 'docx']
+
+# Import the entry point in a fresh interpreter and report the time and which heavy modules came with it
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module, runs):
+    timings = []
+    loaded = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, cwd=SIGPARSER_DIR)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        probe = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(probe['seconds'])
+        loaded = probe['loaded']
+    return statistics.median(timings), loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Guard the startup time of the GUI and CLI entry points')
+    parser.add_argument('modules', nargs='*', default=['main', 'cli'])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=0.3, help='Maximum median import time in seconds')
+    args = parser.parse_args()
+
+    failures = 0
+    for module in args.modules:
+        try:
+            seconds, loaded = measure(module, args.runs)
+        except RuntimeError as e:
+            print(f"{module}: could not be imported ({e})")
+            failures += 1
+            continue
+
+        print(f"{module}: {seconds * 1000:.0f} ms median import time over {args.runs} runs")
+        if loaded:
+            print(f"FAIL {module} eagerly imports {', '.join(loaded)}")
+            failures += 1
+        if seconds > args.budget:
+            print(f"FAIL {module} takes longer than the {args.budget * 1000:.0f} ms budget")
+            failures += 1
+
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,100 @@
+# cli.py
+# Headless runner for scheduled and multi-file imports, e.g. from cron:
+#   python cli.py exports/Contacts.csv exports/Companies.csv projectList.docx
+#   python cli.py --watch /srv/imports --interval 60
+# Never imports tkinter/customtkinter, converters are only loaded inside the worker processes
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import dispatch
+
+
+# Runs in a worker process so independent files are converted in parallel
+def run_file(file_path, full, options):
+    try:
+        return file_path, True, dispatch.process_file(file_path, full=full, **options)
+    except Exception as e:
+        return file_path, False, f'Error: {e}'
+
+
+# Process the files in up to `workers` processes, returns the files that were fully imported
+def run_files(files, workers, full, options):
+    succeeded = []
+    routable = []
+    for file_path in files:
+        if dispatch.route_for(file_path) is None:
+            print(f"Skipping {file_path}: not a Contacts, Companies or .docx file")
+        else:
+            routable.append(file_path)
+    if not routable:
+        return succeeded
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(routable))) as pool:
+        futures = [pool.submit(run_file, file_path, full, options) for file_path in routable]
+        for future in as_completed(futures):
+            file_path, ok, message = future.result()
+            print(f"{file_path}: {message}")
+            if ok:
+                succeeded.append(file_path)
+    return succeeded
+
+
+# Poll a directory and import every new or modified file once its size has stopped changing
+# A file that fails stays pending and is imported again on the next poll
+def watch(directory, interval, workers, full, options):
+    processed = {}
+    pending = {}
+    print(f"Watching {directory} every {interval}s, press Ctrl+C to stop")
+    while True:
+        ready = []
+        for entry in os.scandir(directory):
+            if not entry.is_file() or dispatch.route_for(entry.name) is None:
+                continue
+            stat = entry.stat()
+            signature = (stat.st_size, stat.st_mtime)
+            if processed.get(entry.path) == signature:
+                continue
+            # A file still being copied in changes between polls, wait until it is stable
+            if pending.get(entry.path) == signature:
+                ready.append(entry.path)
+            pending[entry.path] = signature
+
+        if ready:
+            for file_path in run_files(ready, workers, full, options):
+                processed[file_path] = pending.pop(file_path)
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Import SigParser exports and project lists into Supabase without the GUI')
+    parser.add_argument('files', nargs='*', help='Contacts/Companies CSV exports and project list .docx files')
+    parser.add_argument('--watch', metavar='DIR', help='Keep importing new files dropped into this directory')
+    parser.add_argument('--interval', type=float, default=30, help='Seconds between directory scans in watch mode')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Files processed in parallel')
+    parser.add_argument('--concurrency', type=int, default=4, help='Batches uploaded at once per file')
+    parser.add_argument('--chunk-size', type=int, help='Stream CSV exports in chunks of this many rows')
+    parser.add_argument('--state-file', default='sync_state.db', help='SQLite file for fingerprints and watermarks')
+    parser.add_argument('--cache-dir', default='cache', help='Parquet cache of cleaned data, empty to disable')
+    parser.add_argument('--delta', action='store_true', help='Skip rows dated before the day of the last successful run')
+    parser.add_argument('--full', action='store_true', help='Ignore the saved watermark and import every row')
+    parser.add_argument('--debug', action='store_true', help='Write the processed records to JSON for inspection')
+    args = parser.parse_args()
+
+    if not args.files and not args.watch:
+        parser.error('give at least one file or --watch DIR')
+
+    options = {'concurrency': args.concurrency, 'chunk_size': args.chunk_size, 'state_file': args.state_file,
+               'cache_dir': args.cache_dir, 'delta': args.delta, 'debug': args.debug}
+    failed = len(args.files) - len(run_files(args.files, args.workers, args.full, options))
+
+    if args.watch:
+        try:
+            watch(args.watch, args.interval, args.workers, args.full, options)
+        except KeyboardInterrupt:
+            pass
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,127 @@
+# company_resolver.py
+
+import uuid
+from bisect import bisect_right
+
+
+class CompanyResolver:
+    def __init__(self, supabase, page_size: int = 1000, batch_size: int = 500):
+        self.supabase = supabase
+        self.page_size = page_size
+        self.batch_size = batch_size
+
+        # Lowercased company name -> uid, filled on first use
+        self.index = None
+        self.uids = []
+        self.haystack = ''
+        self.offsets = []
+
+    # Load the companies table once using paged bulk reads
+    def load(self):
+        self.index = {}
+        self.uids = []
+        names = []
+
+        start = 0
+        while True:
+            page = (
+                self.supabase.table('companies')
+                .select('uid, company')
+                .order('uid')
+                .range(start, start + self.page_size - 1)
+                .execute()
+                .data
+            )
+            for row in page:
+                if row.get('company'):
+                    self.add(row['company'], row['uid'], names)
+            if len(page) < self.page_size:
+                break
+            start += self.page_size
+
+        self.build_haystack(names)
+        print(f"Loaded {len(self.uids)} companies into the company index")
+
+    # Register a company name in the exact-match index
+    def add(self, company, uid, names):
+        key = company.strip().lower().replace('\n', ' ')
+        self.index.setdefault(key, uid)
+        self.uids.append(uid)
+        names.append(key)
+
+    # Join all names into one string so substring matches run as a single str.find
+    def build_haystack(self, names):
+        self.offsets = []
+        position = 0
+        for name in names:
+            self.offsets.append(position)
+            position += len(name) + 1
+        self.haystack = '\n'.join(names)
+
+    # Case-insensitive match, exact names first, then substring (same as ilike '%company%')
+    def match(self, company):
+        key = company.lower()
+        if key in self.index:
+            return self.index[key]
+        position = self.haystack.find(key)
+        if position >= 0:
+            return self.uids[bisect_right(self.offsets, position) - 1]
+        return None
+
+    # Resolve company names to uids, creating missing companies in one batched insert
+    def resolve(self, companies):
+        if self.index is None:
+            try:
+                self.load()
+            except Exception as e:
+                print(f"Error: Unable to load companies. {e}")
+                return {}
+
+        resolved = {}
+        new_companies = {}
+        for company in set(companies):
+            if not isinstance(company, str) or not company.strip():
+                continue
+            name = company.strip()
+            uid = self.match(name)
+            if uid is None:
+                key = name.lower()
+                if key not in new_companies:
+                    new_companies[key] = {
+                        'uid': str(uuid.uuid4()),  # Generate a new UUID for the company
+                        'company': name,
+                        'website': None,
+                        'linkedin': None,
+                        'domain': None,
+                        'industry': None,
+                        'location': None
+                    }
+                uid = new_companies[key]['uid']
+            resolved[company] = uid
+
+        if new_companies:
+            # Drop uids for companies that could not be created
+            failed = {record['uid'] for record in new_companies.values()} - self.insert(list(new_companies.values()))
+            if failed:
+                resolved = {name: uid for name, uid in resolved.items() if uid not in failed}
+
+        return resolved
+
+    # Insert new companies in batches, add them to the index and return the created uids
+    def insert(self, records):
+        inserted = []
+        for i in range(0, len(records), self.batch_size):
+            batch_data = records[i:i + self.batch_size]
+            try:
+                self.supabase.table('companies').insert(batch_data).execute()
+                inserted.extend(batch_data)
+            except Exception as e:
+                print(f"Error: Unable to insert new companies. {e}")
+                break
+
+        names = self.haystack.split('\n') if self.haystack else []
+        for record in inserted:
+            self.add(record['company'], record['uid'], names)
+        self.build_haystack(names)
+        print(f"Inserted {len(inserted)} new companies")
+        return {record['uid'] for record in inserted}
@@ -0,0 +1,205 @@
+# csv_converter.py
+
+import os
+import pandas as pd
+from dedupe import deduplicate
+from dtypes import compact
+from filter_engine import FilterEngine
+from instrumentation import reported, timed_stage
+from supabase_converter import SupabaseConverter
+from sync_state import WatermarkStore
+
+
+# Reading, delta filtering, caching and deduplication shared by the converters of SigParser CSV exports
+# Subclasses map the raw columns to their table's schema in clean() and describe the export with the attributes below
+class CsvConverter(SupabaseConverter):
+    # Bump whenever transform() output changes so cached frames from older versions are ignored
+    transform_version = 1
+
+    # Define filters as a list of tuples (column, value, condition)
+    filters = []
+
+    # Raw column checked for bot keywords by the filters
+    keyword_column = None
+
+    # Whether transform() drops the rows the filters reject before cleaning
+    filter_rows = True
+
+    # Raw column holding the date a row last changed, and its format, for delta imports
+    date_column = None
+    date_format = None
+
+    # Cleaned columns identifying the same record, with an optional normalizer, checked in order by deduplicate()
+    dedupe_keys = [('uid', None)]
+
+    # Cleaned date columns, most significant first, that decide which duplicate is the latest
+    dedupe_order = []
+
+    # Cleaned columns with few distinct values, stored as categoricals
+    category_columns = []
+
+    def __init__(self, csv_file: str, json_file: str, chunk_size: int = None, debug: bool = False,
+                 concurrency: int = 4, state_file: str = 'sync_state.db', delta: bool = False,
+                 progress=None, cancel=None, cache_dir: str = 'cache'):
+        super().__init__(concurrency, state_file, progress, cancel, cache_dir)
+        self.csv_file = csv_file
+        self.json_file = json_file
+
+        # Write the processed records to json_file for inspection
+        self.debug = debug
+
+        # Filters and bot keywords compiled once into a single mask
+        self.filter_engine = FilterEngine(self.filters, self.keyword_column)
+
+        # Rows per chunk when streaming the CSV, None loads the whole file
+        self.chunk_size = chunk_size
+
+        # Delta mode skips rows dated before the last successful run's newest date unless run(full=True)
+        self.watermarks = WatermarkStore(state_file, self.table) if delta and state_file else None
+        self.full = False
+
+    # Apply filters to data and count records before and after, excluding bot keywords
+    @timed_stage('filter')
+    def apply_filters(self, data):
+        original_count = len(data)
+        data = self.filter_engine.apply(data)
+        filtered_count = len(data)
+        print(f"Filtered data from {original_count} to {filtered_count} records")
+        return data
+
+    # Process the whole CSV at once, None when the file is missing
+    def process_csv(self):
+        # Delta runs depend on the saved watermark, so only full-file runs use the cache
+        if self.cache is not None and self.watermarks is None:
+            with self.report.stage('read'):
+                cached = self.cache.load(self.csv_file, **self.cache_params())
+            if cached is not None:
+                self.report.count('rows_read', len(cached))
+                self.notify('Processing', len(cached), len(cached))
+                return cached
+
+        try:
+            with self.report.stage('read'):
+                data = pd.read_csv(self.csv_file, low_memory=False, dtype=self.csv_dtypes())
+            self.report.count('rows_read', len(data))
+            print(f"Loaded {len(data)} records from {self.csv_file}")
+        except FileNotFoundError:
+            print(f"Error: {self.csv_file} not found")
+            return None
+
+        self.notify('Processing', 0, len(data))
+        filtered_data = self.transform(data)
+        self.notify('Processing', len(data), len(data))
+        if self.cache is not None and self.watermarks is None:
+            self.cache.save(self.csv_file, filtered_data, **self.cache_params())
+        print(filtered_data)
+        return filtered_data
+
+    # Options that change the cleaned output and so are part of the cache key
+    def cache_params(self):
+        return {}
+
+    # dtype overrides for read_csv, e.g. columns that must stay text
+    def csv_dtypes(self):
+        return None
+
+    # Open the CSV for streaming in chunks of chunk_size rows, None when the file is missing
+    def open_chunks(self):
+        try:
+            return pd.read_csv(self.csv_file, chunksize=self.chunk_size, low_memory=False, dtype=self.csv_dtypes())
+        except FileNotFoundError:
+            print(f"Error: {self.csv_file} not found")
+            return None
+
+    # Process an open chunked reader, yielding each processed chunk
+    def process_chunks(self, reader):
+        with reader:
+            for i, chunk in enumerate(self.timed_chunks(reader)):
+                print(f"Processing chunk {i + 1} ({len(chunk)} rows)")
+                yield self.transform(chunk)
+
+    # Time reading each chunk separately from the work done on it
+    def timed_chunks(self, reader):
+        rows_read = 0
+        while True:
+            with self.report.stage('read'):
+                chunk = next(reader, None)
+            if chunk is None or self.cancelled():
+                return
+            self.report.count('rows_read', len(chunk))
+            yield chunk
+            rows_read += len(chunk)
+            self.notify('Processing', rows_read)
+
+    # Skip rows dated before the watermark of the last successful run
+    @timed_stage('delta')
+    def skip_seen(self, data):
+        if self.watermarks is None:
+            return data
+        dates = pd.to_datetime(data[self.date_column], format=self.date_format, errors='coerce')
+        return self.watermarks.filter_newer(data, dates, self.full)
+
+    # Filter and transform a frame of raw SigParser rows to the table's schema
+    def transform(self, data):
+        # Drop rows already imported before doing any cleaning
+        data = self.skip_seen(data)
+
+        if self.filter_rows:
+            data = self.apply_filters(data)
+        return self.deduplicate(self.compact(self.clean(data)))
+
+    # Map the raw columns to the table's schema
+    def clean(self, data):
+        raise NotImplementedError
+
+    # Shrink the cleaned frame to categorical and Arrow string columns, keeping empty values as nulls
+    @timed_stage('dtypes')
+    def compact(self, data):
+        return compact(data, self.category_columns)
+
+    # Collapse rows for the same record, keeping the latest, so a batch never carries a record twice
+    @timed_stage('dedupe')
+    def deduplicate(self, data):
+        data, merged = deduplicate(data, self.dedupe_keys, self.dedupe_order)
+        self.report.count('records_merged', merged)
+        if merged:
+            print(f"Merged {merged} duplicate records")
+        return data
+
+    # Save data to JSON
+    def save_to_json(self, data):
+        try:
+            if os.path.exists(self.json_file):
+                previous_data = pd.read_json(self.json_file)
+                if not data.equals(previous_data):
+                    data.to_json(self.json_file, orient='records', indent=2)
+                    print(f"{self.json_file} updated successfully")
+                else:
+                    print(f"No changes detected. {self.json_file} not updated")
+            else:
+                print(f"Creating {self.json_file}")
+                data.to_json(self.json_file, orient='records', indent=2)
+        except Exception as e:
+            print(f"Error: Unable to write to {self.json_file}. {e}")
+            return False
+        return True
+
+    # Main function to run the conversion and upload, returns whether every batch was uploaded
+    @reported
+    def run(self, full: bool = False):
+        self.full = full
+        self.begin_sync(self.csv_file)
+        if self.chunk_size:
+            reader = self.open_chunks()
+            if reader is None:
+                return False
+            return self.upload_chunks(self.process_chunks(reader))
+
+        data = self.process_csv()
+        if data is not None:
+            # The JSON file is only written as a debug artifact
+            if self.debug:
+                self.save_to_json(data)
+            print('Uploading to Supabase')
+            return self.upload(data)
+        return False
@@ -0,0 +1,32 @@
+# dedupe.py
+
+import pandas as pd
+
+
+# Case and whitespace differences don't make a different email address or domain, missing values stay missing
+def normalize_text(values):
+    return values.astype('string').str.strip().str.lower()
+
+
+# Collapse rows that share a key, keeping the most recent row of each group
+# keys are (column, normalizer) pairs applied in turn, e.g. uid first and then normalized email;
+# order_by lists date columns, newest first, that decide which row survives.
+# Blank keys are never merged. Returns the deduplicated rows in their original order and the number merged.
+def deduplicate(data, keys, order_by=()):
+    if data.empty:
+        return data, 0
+
+    if order_by:
+        dates = pd.DataFrame({col: pd.to_datetime(data[col], errors='coerce', format='mixed') for col in order_by})
+        order = dates.sort_values(list(order_by), ascending=False, na_position='last', kind='stable').index
+        ranked = data.loc[order]
+    else:
+        ranked = data
+
+    for column, normalizer in keys:
+        values = ranked[column] if normalizer is None else normalizer(ranked[column])
+        blank = values.isna() | values.astype(str).str.strip().eq('')
+        ranked = ranked[blank | ~values.duplicated(keep='first')]
+
+    merged = len(data) - len(ranked)
+    return (data.loc[data.index.isin(ranked.index)] if merged else data), merged
@@ -0,0 +1,74 @@
+# dispatch.py
+
+import importlib
+import os
+from collections import namedtuple
+
+# How a file is recognized and which converter handles it
+# Converter modules are imported on first use so callers that only route files stay light
+Route = namedtuple('Route', ['name', 'match', 'module', 'converter', 'files', 'options', 'message'])
+
+ROUTES = [
+    Route('contacts', 'Contacts', 'contact_process', 'ContactConverter',
+          {'json_file': 'StockContacts.json'},
+          ('resolve_companies', 'chunk_size', 'debug', 'concurrency', 'state_file', 'delta', 'progress', 'cancel', 'cache_dir'),
+          'Contacts processed successfully'),
+    Route('companies', 'Companies', 'company_process', 'CompanyConverter',
+          {'json_file': 'StockCompanies.json'},
+          ('chunk_size', 'debug', 'concurrency', 'state_file', 'delta', 'progress', 'cancel', 'cache_dir'),
+          'Companies updated processed successfully'),
+    Route('projects', '.docx', 'jobList_process', 'ProjectListConverter',
+          {'csv_file': 'projectList.csv', 'json_file': 'projectList.json'},
+          ('debug', 'concurrency', 'state_file', 'progress', 'cancel', 'cache_dir'),
+          'Project List converted successfully'),
+]
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+# Find the route for a file by name, the same way the GUI always has
+def route_for(file_path: str):
+    for route in ROUTES:
+        if route.match in os.path.basename(file_path):
+            return route
+    return None
+
+
+def load_converter(route: Route):
+    return getattr(importlib.import_module(route.module), route.converter)
+
+
+# Import every converter module, and with it pandas, phonenumbers and the rest, ahead of first use
+# Meant for a background thread once the window is up, a failure here surfaces again on real use
+def warm_up():
+    for route in ROUTES:
+        try:
+            load_converter(route)
+        except Exception as e:
+            print(f"Warm-up of {route.module} failed: {e}")
+
+
+# Build the converter for a file, passing only the options that converter supports
+def create_converter(file_path: str, **options):
+    route = route_for(file_path)
+    if route is None:
+        raise ValueError(f"{file_path} is not a Contacts, Companies or .docx file")
+
+    files = dict(route.files)
+    files['docx_file' if route.name == 'projects' else 'csv_file'] = file_path
+    supported = {key: value for key, value in options.items() if key in route.options}
+    return route, load_converter(route)(**files, **supported)
+
+
+# Process one file end to end and return the success message, raising if any batch failed or it was cancelled
+# full re-imports every row of a delta run, the project list has no delta mode
+def process_file(file_path: str, full: bool = False, **options):
+    route, converter = create_converter(file_path, **options)
+    uploaded = converter.run() if route.name == 'projects' else converter.run(full=full)
+    if options.get('cancel') is not None and options['cancel'].is_set():
+        raise ImportCancelled(f"Import of {os.path.basename(file_path)} cancelled")
+    if not uploaded:
+        raise RuntimeError(f"{os.path.basename(file_path)} was not fully uploaded, see the log for details")
+    return route.message
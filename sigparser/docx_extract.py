@@ -0,0 +1,113 @@
+# docx_extract.py
+
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+BODY = W + 'body'
+TBL = W + 'tbl'
+TR = W + 'tr'
+TC = W + 'tc'
+P = W + 'p'
+R = W + 'r'
+
+
+# Text of a run, translating tabs, breaks and hyphens the same way python-docx does
+def run_text(run):
+    parts = []
+    for e in run:
+        if e.tag == W + 't':
+            parts.append(e.text or '')
+        elif e.tag in (W + 'tab', W + 'ptab'):
+            parts.append('\t')
+        elif e.tag == W + 'br':
+            if e.get(W + 'type', 'textWrapping') == 'textWrapping':
+                parts.append('\n')
+        elif e.tag == W + 'cr':
+            parts.append('\n')
+        elif e.tag == W + 'noBreakHyphen':
+            parts.append('-')
+    return ''.join(parts)
+
+
+def paragraph_text(paragraph):
+    parts = []
+    for e in paragraph:
+        if e.tag == R:
+            parts.append(run_text(e))
+        elif e.tag == W + 'hyperlink':
+            parts.extend(run_text(r) for r in e if r.tag == R)
+    return ''.join(parts)
+
+
+# Cell text is its direct paragraphs joined by newlines, nested tables are ignored
+def cell_text(tc):
+    return '\n'.join(paragraph_text(p) for p in tc if p.tag == P)
+
+
+def int_val(parent, tag, default):
+    e = parent.find(W + tag) if parent is not None else None
+    return int(e.get(W + 'val')) if e is not None else default
+
+
+# Expand a table row into one text per layout-grid column, like python-docx's row.cells:
+# horizontally merged cells repeat for every column they span and vertically merged
+# cells repeat the text of the cell above them
+def row_cells(tr, above):
+    cells = []
+    grid = {}
+    offset = int_val(tr.find(W + 'trPr'), 'gridBefore', 0)
+
+    for tc in tr:
+        if tc.tag != TC:
+            continue
+        tcPr = tc.find(W + 'tcPr')
+        span = int_val(tcPr, 'gridSpan', 1)
+        v_merge = tcPr.find(W + 'vMerge') if tcPr is not None else None
+
+        if v_merge is not None and v_merge.get(W + 'val', 'continue') == 'continue':
+            text = above.get(offset, '')
+        else:
+            text = cell_text(tc)
+
+        grid[offset] = text
+        cells.extend([text] * span)
+        offset += span
+
+    return cells, grid
+
+
+# Stream the rows of every top-level table straight out of word/document.xml
+def iter_table_rows(docx_file):
+    with zipfile.ZipFile(docx_file) as archive, archive.open('word/document.xml') as xml:
+        path = []
+        body = None
+        above = {}
+
+        for event, elem in iterparse(xml, events=('start', 'end')):
+            if event == 'start':
+                path.append(elem.tag)
+                if elem.tag == BODY:
+                    body = elem
+                elif elem.tag == TBL and path[-2:] == [BODY, TBL]:
+                    above = {}
+                continue
+
+            path.pop()
+            if elem.tag == TR and path[-2:] == [BODY, TBL]:
+                cells, above = row_cells(elem, above)
+                yield [text.replace("\n", " ").strip() for text in cells]
+                elem.clear()
+            elif body is not None and path and path[-1] == BODY:
+                # Drop finished paragraphs and tables so memory stays flat
+                body.remove(elem)
+
+
+# Yield (job_no, description) pairs from the project list tables
+def iter_projects(docx_file):
+    for row_data in iter_table_rows(docx_file):
+        unique_data = list(dict.fromkeys(row_data))  # Remove duplicates
+        for i in range(0, len(unique_data), 2):
+            pair = unique_data[i:i + 2]
+            if len(pair) >= 2:
+                yield pair[0], pair[1]
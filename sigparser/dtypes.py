@@ -0,0 +1,30 @@
+# dtypes.py
+
+import pandas as pd
+
+# pyarrow is optional, without it text columns use pandas' own string storage
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = pd.StringDtype('pyarrow')
+except ImportError:
+    TEXT_DTYPE = pd.StringDtype()
+
+
+# Store the given low-cardinality columns as categoricals and every other text column as Arrow-backed strings
+# Missing values stay nulls here, records() only turns them into empty strings when a batch is serialized
+def compact(data, categories=()):
+    converted = {}
+    for col in data.columns:
+        if col in categories:
+            converted[col] = data[col].astype('category')
+        elif pd.api.types.infer_dtype(data[col], skipna=True) == 'string':
+            converted[col] = data[col].astype(TEXT_DTYPE)
+    return data.assign(**converted)
+
+
+# Upload records for a frame, with nulls sent as empty strings
+# Built column by column, which is faster than to_dict() on categorical and Arrow columns
+def records(data):
+    columns = list(data.columns)
+    values = [data[col].to_numpy(dtype=object, na_value='') for col in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
@@ -0,0 +1,168 @@
+# fake_supabase.py
+
+import os
+import random
+import re
+import threading
+import time
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, backend, table: str):
+        self.backend = backend
+        self.table = table
+        self.action = 'select'
+        self.columns = None
+        self.records = []
+        self.conditions = []
+        self.lookups = []
+        self.order_column = None
+        self.row_range = None
+
+    def select(self, columns: str = '*'):
+        self.action = 'select'
+        if columns.strip() != '*':
+            self.columns = [col.strip() for col in columns.split(',')]
+        return self
+
+    def insert(self, records):
+        self.action = 'insert'
+        self.records = records if isinstance(records, list) else [records]
+        return self
+
+    def upsert(self, records):
+        self.action = 'upsert'
+        self.records = records if isinstance(records, list) else [records]
+        return self
+
+    def eq(self, column, value):
+        self.conditions.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.conditions.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.lookups.append((column, values))
+        self.conditions.append(lambda row: row.get(column) in values)
+        return self
+
+    # Postgres ilike: % matches any run of characters, _ any single character
+    def ilike(self, column, pattern):
+        regex = re.compile(''.join(
+            '.*' if char == '%' else '.' if char == '_' else re.escape(char) for char in pattern
+        ), re.IGNORECASE | re.DOTALL)
+        self.conditions.append(lambda row: row.get(column) is not None and regex.fullmatch(str(row[column])) is not None)
+        return self
+
+    def order(self, column, desc: bool = False):
+        self.order_column = (column, desc)
+        return self
+
+    def range(self, start, end):
+        self.row_range = (start, end)
+        return self
+
+    def execute(self):
+        return FakeResponse(self.backend.execute(self))
+
+
+class FakeSupabaseError(Exception):
+    pass
+
+
+# In-process stand-in for the handful of Supabase table operations the converters use
+# latency is the simulated round trip in seconds (plus up to `jitter` seconds) and
+# failure_rate the share of requests that fail before reaching the table; writes of more than
+# max_records rows are rejected like a gateway's request size limit
+class FakeSupabase:
+    def __init__(self, tables=None, primary_keys=None, latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = None, max_records: int = None):
+        self.tables = {name: {} for name in tables or []}
+        self.primary_keys = {'project_list': 'job_no', **(primary_keys or {})}
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.max_records = max_records
+        self.random = random.Random(seed)
+        self.requests = []
+        self.failures = 0
+        self.lock = threading.Lock()
+
+    # Build a fake backend from FAKE_SUPABASE_* environment variables
+    @classmethod
+    def from_env(cls):
+        seed = os.getenv('FAKE_SUPABASE_SEED')
+        max_records = os.getenv('FAKE_SUPABASE_MAX_RECORDS')
+        return cls(
+            latency=float(os.getenv('FAKE_SUPABASE_LATENCY_MS', '0')) / 1000,
+            jitter=float(os.getenv('FAKE_SUPABASE_JITTER_MS', '0')) / 1000,
+            failure_rate=float(os.getenv('FAKE_SUPABASE_FAILURE_RATE', '0')),
+            seed=int(seed) if seed else None,
+            max_records=int(max_records) if max_records else None,
+        )
+
+    def table(self, table: str):
+        return FakeQuery(self, table)
+
+    # Load rows into a table, e.g. to pre-populate existing contacts
+    def seed(self, table, rows):
+        key = self.primary_keys.get(table, 'uid')
+        with self.lock:
+            store = self.tables.setdefault(table, {})
+            for row in rows:
+                store[row[key]] = dict(row)
+
+    # Wait out the simulated round trip outside the lock so concurrent requests overlap
+    def round_trip(self, query):
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.failure_rate
+            self.requests.append((query.table, query.action))
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            with self.lock:
+                self.failures += 1
+            raise FakeSupabaseError(f'Injected failure for {query.action} on {query.table}')
+        if self.max_records is not None and len(query.records) > self.max_records:
+            raise FakeSupabaseError(f'413 Payload Too Large: {len(query.records)} records for {query.table}')
+
+    def execute(self, query):
+        self.round_trip(query)
+        key = self.primary_keys.get(query.table, 'uid')
+        with self.lock:
+            store = self.tables.setdefault(query.table, {})
+
+            if query.action == 'insert':
+                for record in query.records:
+                    if record.get(key) in store:
+                        raise Exception(f'duplicate key value violates unique constraint on {query.table}.{key}')
+                    store[record.get(key)] = dict(record)
+                return [dict(record) for record in query.records]
+
+            if query.action == 'upsert':
+                for record in query.records:
+                    store.setdefault(record.get(key), {}).update(record)
+                return [dict(record) for record in query.records]
+
+            # in_ on the primary key reads the matching rows directly instead of scanning the table
+            values = next((values for column, values in query.lookups if column == key), None)
+            candidates = store.values() if values is None else [store[value] for value in values if value in store]
+            rows = [row for row in candidates if all(condition(row) for condition in query.conditions)]
+            if query.order_column:
+                column, desc = query.order_column
+                rows.sort(key=lambda row: str(row.get(column)), reverse=desc)
+            if query.row_range:
+                start, end = query.row_range
+                rows = rows[start:end + 1]
+            if query.columns:
+                rows = [{col: row.get(col) for col in query.columns} for row in rows]
+            return [dict(row) for row in rows]
@@ -0,0 +1,53 @@
+# filter_engine.py
+
+import re
+import operator
+import pandas as pd
+
+# Bot and system mailboxes excluded by both converters
+BOT_KEYWORDS = ['reply', 'noreply', 'invoices', 'support', 'do-not-reply', 'donotreply', 'bids', 'billing', 'vendor']
+
+OPERATORS = {
+    '!=': operator.ne,
+    '==': operator.eq,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+}
+
+
+class FilterEngine:
+    def __init__(self, filters, keyword_column: str, keywords=BOT_KEYWORDS):
+        # filters is a list of (column, value, condition) tuples
+        for column, value, condition in filters:
+            if condition not in OPERATORS:
+                raise ValueError(f"Unsupported filter condition '{condition}' for column '{column}'")
+        self.filters = filters
+        self.keyword_column = keyword_column
+
+        # Compiled once and matched case-insensitively, same as lower() + str.contains
+        self.keyword_pattern = re.compile('|'.join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+    # Build a single boolean mask for all rules, counting the rows each rule rejects
+    def mask(self, data):
+        keep = pd.Series(True, index=data.index)
+        rejected = {}
+
+        for column, value, condition in self.filters:
+            rule = OPERATORS[condition](data[column], value).fillna(False).astype(bool)
+            rejected[f'{column} {condition} {value!r}'] = int((~rule).sum())
+            keep &= rule
+
+        keywords = data[self.keyword_column].str.contains(self.keyword_pattern, na=False).astype(bool)
+        rejected[f'{self.keyword_column} bot keywords'] = int(keywords.sum())
+        keep &= ~keywords
+
+        return keep, rejected
+
+    # Apply the mask in one pass and report how many rows each rule rejected
+    def apply(self, data):
+        keep, rejected = self.mask(data)
+        for rule, count in rejected.items():
+            print(f"  {rule}: rejected {count} records")
+        return data[keep]
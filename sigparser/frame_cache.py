@@ -0,0 +1,97 @@
+# frame_cache.py
+
+import glob
+import hashlib
+import json
+import os
+
+from sync_state import file_digest
+
+# pyarrow is optional, without it every import simply re-processes the source file
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+# Parquet copies of cleaned DataFrames, keyed by the source file's content and the converter's transform version
+class FrameCache:
+    def __init__(self, cache_dir: str, name: str, version: int, keep: int = 5):
+        self.cache_dir = cache_dir
+        self.name = name  # Converter the frames belong to, e.g. 'contacts'
+        self.version = version  # Bumped whenever the converter's cleaning output changes
+        self.keep = keep  # Most recently written frames kept per converter
+        self.index_file = os.path.join(cache_dir, 'index.json')
+
+    @property
+    def enabled(self):
+        return pa is not None
+
+    # Content digest of the source file, rehashed only when its size or mtime changed
+    def digest(self, source_file: str):
+        stat = os.stat(source_file)
+        index = self.load_index()
+        path = os.path.abspath(source_file)
+        entry = index.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['digest']
+
+        digest = file_digest(source_file)
+        index[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'digest': digest}
+        self.save_index(index)
+        return digest
+
+    def load_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # Written to a temporary file first so parallel CLI workers never see a half-written index
+    def save_index(self, index):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_file = f"{self.index_file}.{os.getpid()}"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(temp_file, self.index_file)
+
+    # Parquet file for a source file, params are any options that change the cleaned output
+    def path(self, source_file: str, **params):
+        key = json.dumps({'digest': self.digest(source_file), 'version': self.version, **params}, sort_keys=True)
+        return os.path.join(self.cache_dir, f"{self.name}_{hashlib.sha256(key.encode()).hexdigest()[:32]}.parquet")
+
+    # Cached frame for the source file, or None on a miss
+    def load(self, source_file: str, **params):
+        if not self.enabled:
+            return None
+        try:
+            path = self.path(source_file, **params)
+            if not os.path.exists(path):
+                return None
+            # Memory mapped so the Arrow buffers are read straight from the page cache
+            data = pq.read_table(path, memory_map=True).to_pandas()
+        except FileNotFoundError:
+            return None
+        except (OSError, pa.ArrowException) as e:
+            print(f"Error: Unable to read the cache for {source_file}. {e}")
+            return None
+        print(f"Loaded {len(data)} cleaned records for {source_file} from the cache")
+        return data
+
+    def save(self, source_file: str, data, **params):
+        if not self.enabled:
+            return
+        try:
+            path = self.path(source_file, **params)
+            pq.write_table(pa.Table.from_pandas(data, preserve_index=False), path)
+            self.prune()
+        except (OSError, pa.ArrowException) as e:
+            print(f"Error: Unable to cache the cleaned data for {source_file}. {e}")
+
+    # Drop all but the newest frames of this converter so old exports don't pile up
+    def prune(self):
+        frames = sorted(glob.glob(os.path.join(self.cache_dir, f"{self.name}_*.parquet")), key=os.path.getmtime)
+        for path in frames[:-self.keep]:
+            os.remove(path)
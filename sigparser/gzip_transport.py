@@ -0,0 +1,25 @@
+# gzip_transport.py
+
+import gzip
+import httpx
+
+
+# httpx transport that gzip-compresses request bodies above min_bytes
+# Only for deployments whose gateway accepts Content-Encoding: gzip, PostgREST on its own does not
+class GzipTransport(httpx.HTTPTransport):
+    def __init__(self, min_bytes: int = 1024, level: int = 6, **kwargs):
+        super().__init__(**kwargs)
+        self.min_bytes = min_bytes
+        self.level = level
+
+    def handle_request(self, request: httpx.Request):
+        if request.method in ('POST', 'PATCH', 'PUT') and 'content-encoding' not in request.headers:
+            body = request.read()
+            if len(body) >= self.min_bytes:
+                # Content-Length is recomputed for the compressed body
+                headers = httpx.Headers({key: value for key, value in request.headers.items() if key != 'content-length'})
+                headers['Content-Encoding'] = 'gzip'
+                request = httpx.Request(request.method, request.url, headers=headers,
+                                        content=gzip.compress(body, compresslevel=self.level),
+                                        extensions=request.extensions)
+        return super().handle_request(request)
@@ -0,0 +1,198 @@
+# instrumentation.py
+
+import cProfile
+import contextlib
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+# SIGPARSER_PROFILE=cprofile, tracemalloc or both turns on the optional profilers
+PROFILE_ENV = 'SIGPARSER_PROFILE'
+REPORT_DIR_ENV = 'SIGPARSER_REPORT_DIR'
+
+
+class RunReport:
+    def __init__(self, name: str):
+        self.name = name
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.reset()
+
+    def reset(self):
+        self.started = None
+        self.seconds = None
+        self.stages = {}
+        self.counters = {}
+        self.requests = {}
+        self.profiler = None
+        self.memory = None
+
+    # Time a pipeline stage, excluding time spent in stages nested inside it
+    @contextlib.contextmanager
+    def stage(self, name, rows: int = None):
+        stack = self.local.__dict__.setdefault('stack', [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self.lock:
+                stage = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'rows': 0})
+                stage['seconds'] += elapsed - nested
+                stage['calls'] += 1
+                stage['rows'] += rows or 0
+
+    def count(self, name, value: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_request(self, table, action, seconds, payload_bytes, rows, ok):
+        with self.lock:
+            request = self.requests.setdefault(f'{action} {table}', {
+                'count': 0, 'errors': 0, 'seconds': 0.0, 'payload_bytes': 0, 'rows': 0
+            })
+            request['count'] += 1
+            request['errors'] += 0 if ok else 1
+            request['seconds'] += seconds
+            request['payload_bytes'] += payload_bytes
+            request['rows'] += rows
+
+    def start(self):
+        self.reset()
+        self.started = datetime.datetime.now()
+        self.clock = time.perf_counter()
+
+        profile = os.getenv(PROFILE_ENV, '').lower()
+        if profile in ('cprofile', 'both'):
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        if profile in ('tracemalloc', 'both') and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.memory = True
+
+    def finish(self):
+        self.seconds = time.perf_counter() - self.clock
+        data = self.to_dict()
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            data['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+            data['top_allocations'] = [str(stat) for stat in snapshot.statistics('lineno')[:20]]
+            tracemalloc.stop()
+
+        # A report that cannot be written never fails the run it describes
+        try:
+            report_dir = os.getenv(REPORT_DIR_ENV, 'reports')
+            os.makedirs(report_dir, exist_ok=True)
+            base = os.path.join(report_dir, f"{self.name}_{self.started:%Y%m%d_%H%M%S}")
+            if self.profiler is not None:
+                self.profiler.dump_stats(base + '.prof')
+                data['profile'] = base + '.prof'
+            with open(base + '.json', 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            print(f"Run report saved to {base}.json")
+        except OSError as e:
+            print(f"Error: Unable to write run report. {e}")
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'converter': self.name,
+                'started': self.started.isoformat(timespec='seconds') if self.started else None,
+                'seconds': round(self.seconds, 4) if self.seconds is not None else None,
+                'stages': {name: {**stage, 'seconds': round(stage['seconds'], 4)} for name, stage in self.stages.items()},
+                'requests': {name: {**request, 'seconds': round(request['seconds'], 4)}
+                             for name, request in self.requests.items()},
+                'counters': dict(self.counters),
+            }
+
+
+# Wraps a converter's run() so the report covers the whole run and is written at the end
+def reported(run):
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        self.report.start()
+        try:
+            return run(self, *args, **kwargs)
+        finally:
+            self.report.finish()
+    return wrapper
+
+
+# Times a converter method as a named stage of its run report
+def timed_stage(name):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            rows = len(args[0]) if args and hasattr(args[0], '__len__') else None
+            with self.report.stage(name, rows):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Estimated JSON size of a write payload, without serializing it a second time
+# record_bytes is the average serialized record size when known, e.g. the AdaptiveBatcher's,
+# otherwise it is measured on the first sample_size records
+def payload_size(payload, record_bytes: float = None, sample_size: int = 20):
+    records = payload if isinstance(payload, list) else [payload]
+    if record_bytes is None:
+        sample = records[:sample_size]
+        record_bytes = len(json.dumps(sample, default=str).encode()) / max(1, len(sample))
+    return int(record_bytes * len(records))
+
+
+# Supabase client wrapper that times every request and estimates its payload size
+class InstrumentedClient:
+    def __init__(self, client, report: RunReport, record_bytes: float = None):
+        self.client = client
+        self.report = report
+        self.record_bytes = record_bytes
+
+    def table(self, table: str):
+        return InstrumentedQuery(self.client.table(table), table, self.report, self.record_bytes)
+
+
+class InstrumentedQuery:
+    def __init__(self, query, table, report, record_bytes=None):
+        self.query = query
+        self.table = table
+        self.report = report
+        self.record_bytes = record_bytes
+        self.action = 'select'
+        self.payload_bytes = 0
+
+    def __getattr__(self, attr):
+        method = getattr(self.query, attr)
+        if attr == 'execute':
+            return self.execute
+
+        @functools.wraps(method)
+        def builder(*args, **kwargs):
+            if attr in ('insert', 'upsert', 'update', 'delete'):
+                self.action = attr
+                if args:
+                    self.payload_bytes = payload_size(args[0], self.record_bytes)
+            self.query = method(*args, **kwargs)
+            return self
+        return builder
+
+    def execute(self):
+        start = time.perf_counter()
+        try:
+            response = self.query.execute()
+        except Exception:
+            self.report.record_request(self.table, self.action, time.perf_counter() - start, self.payload_bytes, 0, False)
+            raise
+        rows = len(response.data) if isinstance(getattr(response, 'data', None), list) else 0
+        self.report.record_request(self.table, self.action, time.perf_counter() - start, self.payload_bytes, rows, True)
+        return response
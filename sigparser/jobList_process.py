@@ -1,139 +1,114 @@
-import csv
-from docx import Document
-import os
 import pandas as pd
-import json
-from supabase import create_client, Client
-from dotenv import load_dotenv
+from instrumentation import reported, timed_stage
+from dedupe import deduplicate
+from supabase_converter import SupabaseConverter
+from docx_extract import iter_projects
 
-load_dotenv()
-class ProjectListConverter:
-    def __init__(self, csv_file: str, json_file: str, docx_file: str):
+class ProjectListConverter(SupabaseConverter):
+    table = 'project_list'
+    key = 'job_no'
+    label = 'Projects'
+
+    # Projects already on the server are only counted, never updated
+    update_existing = False
+
+    # Bump whenever process_docx()/process_csv() output changes so cached frames from older versions are ignored
+    transform_version = 2
+
+    def __init__(self, csv_file: str, json_file: str, docx_file: str, debug: bool = False, concurrency: int = 4, state_file: str = 'sync_state.db', progress=None, cancel=None, cache_dir: str = 'cache'):
+        super().__init__(concurrency, state_file, progress, cancel, cache_dir)
         self.csv_file = csv_file
         self.json_file = json_file
-        self.docx_file = Document(docx_file)
-        
-        self.supabase_url: str = os.getenv('SUPABASE_URL')
-        self.supabase_key: str = os.getenv('SERVICE_ROLE_KEY')
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
-        
+
+        # Write the processed records to csv_file and json_file for inspection
+        self.debug = debug
+        self.docx_file = docx_file
+
+    # Returns None when cancelled part way, so a partial project list is never cached or uploaded
+    @timed_stage('read')
     def process_docx(self):
-        extracted_data = []
         processed_data = []
 
-        for table in self.docx_file.tables:
-            for row in table.rows:
-                row_data = [cell.text.replace("\n", " ").strip() for cell in row.cells]
-
-                unique_data = list(dict.fromkeys(row_data))  # Remove duplicates
-                for i in range(0, len(unique_data), 2):
-                    extracted_data.append(unique_data[i:i + 2])
-
-        for row in extracted_data:
-            if len(row) >= 2:
-                job_no, description = row[0], row[1]
-                confidential = False  # Default to False
-                notes = ""
-        
-                # Check if "confidential" exists in the description (case-insensitive)
-                if "confidential" in description.casefold():
-                    confidential = True
-                elif "confidential" in job_no.casefold():
-                    confidential = True
-    
-                # Check for additional items besides job_no
-                if " " in job_no:
-                    job_no, notes = job_no.split(" ", 1)
+        # Rows are streamed out of the .docx as (job_no, description) pairs
+        for job_no, description in iter_projects(self.docx_file):
+            confidential = False  # Default to False
+            notes = ""
 
-                processed_data.append({"job_no": job_no, "description": description, "notes": notes, "confidential": confidential})
+            # Check if "confidential" exists in the description (case-insensitive)
+            if "confidential" in description.casefold():
+                confidential = True
+            elif "confidential" in job_no.casefold():
+                confidential = True
+
+            # Check for additional items besides job_no
+            if " " in job_no:
+                job_no, notes = job_no.split(" ", 1)
+
+            processed_data.append({"job_no": job_no, "description": description, "notes": notes, "confidential": confidential})
+            if len(processed_data) % self.batch_size == 0:
+                self.notify('Reading', len(processed_data))
+                if self.cancelled():
+                    return None
 
         return processed_data
 
+    # Collapse rows for the same job_no, keeping the first, so a batch never carries a project twice
+    @timed_stage('dedupe')
+    def deduplicate(self, df):
+        df, merged = deduplicate(df, [('job_no', None)])
+        self.report.count('records_merged', merged)
+        if merged:
+            print(f"Merged {merged} duplicate projects")
+        return df
+
+    @timed_stage('clean')
     def process_csv(self, data):
-        df = pd.DataFrame(data)
-        df.to_csv(self.csv_file, index=False)
-        print(f"Processed CSV saved to {self.csv_file}")
+        df = self.deduplicate(pd.DataFrame(data))
+        # The CSV file is only written as a debug artifact
+        if self.debug:
+            df.to_csv(self.csv_file, index=False)
+            print(f"Processed CSV saved to {self.csv_file}")
         return df
 
     def save_to_json(self, df):
         df.to_json(self.json_file, orient="records", indent=2)
         print(f"Data saved to JSON file: {self.json_file}")
 
-    def upload_to_supabase(self):
-        batch_size = 500
-        
-        try:
-            with open(self.json_file, 'r', encoding='utf-8') as file:
-                json_data = json.load(file)
-            print(f'Successfully loaded {len(json_data)} projects from {self.json_file}')
-        except FileNotFoundError:
-            print(f'Error: {self.json_file} not found')
-            return False
-        except json.JSONDecodeError as e:
-            print(f'Error... Unable to load records from {self.json_file}: {e}')
-            
-        job_nos = [record.get('job_no') for record in json_data if record.get('job_no')]
-        
-        projects = set()
-        
-        for i in range(0, len(job_nos), batch_size):
-            batch_projects = job_nos[i:i + batch_size]
-            
-            projects_result = (
-                self.supabase.table('project_list')
-                .select('job_no')
-                .in_('job_no', batch_projects)
-                .execute()
-                .data
-            )
-            if projects_result:
-                projects.update(project['job_no']for project in projects_result)
-                
-        new_records = []
-        updates = [] 
-        
-        for record in json_data:
-            job_no = record.get('job_no')
-            if job_no in projects:
-                updates.append(record)
-            else:
-                new_records.append(record)
-            
-        print(f'New Projects Found: {len(new_records)}')
-        print(f'Potential Updates to Projects: {len(updates)}')
-        
-        if len(new_records) > 0:
-            for i in range(0, len(new_records), batch_size):
-                batch_data = new_records[i:i + batch_size]
-                try:
-                    self.supabase.table('project_list').upsert(batch_data).execute()
-                    print(f"Inserted {len(batch_data)} records")
-                except Exception as e:
-                    print(f"Error: Unable to insert records. {e}")
-                    print(f"Batch Data: {batch_data}")
-                    return False
-        else:
-            print('No new records to add')
-    
-        print(f"Uploaded {len(json_data)} records to the database\nProcess Completed Successfully")
-        os.remove(self.json_file)   
-        os.remove(self.csv_file)
+    # Process the DOCX into a DataFrame (CSV written only in debug mode), reusing the cached frame when unchanged
+    def load_projects(self):
+        if self.cache is not None:
+            with self.report.stage('read'):
+                df = self.cache.load(self.docx_file)
+            if df is not None:
+                return df
 
-    def run(self):
-        # Step 1: Process DOCX
         processed_data = self.process_docx()
         if not processed_data:
-            print("Error: No data extracted from DOCX file.")
-            return
-
-        # Step 2: Save to CSV
+            return None
         df = self.process_csv(processed_data)
+        if self.cache is not None:
+            self.cache.save(self.docx_file, df)
+        return df
+
+    @reported
+    def run(self):
+        self.begin_sync(self.docx_file)
+
+        # Steps 1 and 2: Process DOCX and build the DataFrame, or load it from the cache
+        df = self.load_projects()
+        if df is None:
+            if self.cancelled():
+                print("Import cancelled while reading the DOCX file")
+            else:
+                print("Error: No data extracted from DOCX file.")
+            return False
 
-        # Step 3: Save to JSON
-        self.save_to_json(df)
+        # Step 3: Save to JSON as a debug artifact
+        if self.debug:
+            self.save_to_json(df)
 
-        # Step 4: Upload to Supabase
-        self.upload_to_supabase()
+        # Step 4: Upload new and changed projects to Supabase straight from memory
+        return self.upload(df)
 
 
 # Example usage
@@ -0,0 +1,87 @@
+# job_queue.py
+
+import itertools
+import queue
+import threading
+
+import dispatch
+from progress import ProgressQueue
+
+
+class Job:
+    def __init__(self, job_id: int, file_path: str, options: dict):
+        self.id = job_id
+        self.file_path = file_path
+        self.options = options
+        self.status = 'queued'  # queued, running, done, failed or cancelled
+        self.message = None
+
+        # Progress and the final message go through the queue, so the Tk thread never waits on the worker
+        self.progress = ProgressQueue()
+        self.cancel_event = threading.Event()
+
+    # Ask the job to stop, a running import finishes its in-flight batches first
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'cancelled')
+
+
+# Runs imports one after another (or on a small pool) so uploads never overlap against Supabase
+class JobManager:
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+        self.jobs = queue.Queue()
+        self.ids = itertools.count(1)
+        self.threads = []
+        self.submitted = []
+        self.lock = threading.Lock()
+
+    # Queue a file for import and return its Job handle
+    def submit(self, file_path: str, **options):
+        job = Job(next(self.ids), file_path, options)
+        self.jobs.put(job)
+        with self.lock:
+            self.submitted = [queued for queued in self.submitted if not queued.finished] + [job]
+            if len(self.threads) < self.workers:
+                thread = threading.Thread(target=self.work, name=f'import-worker-{len(self.threads) + 1}', daemon=True)
+                self.threads.append(thread)
+                thread.start()
+        return job
+
+    def work(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            self.run(job)
+
+    def run(self, job: Job):
+        if job.cancel_event.is_set():
+            job.status, job.message = 'cancelled', 'Import cancelled'
+            job.progress.finish(job.message)
+            return
+
+        job.status = 'running'
+        try:
+            print(f'Processing {job.file_path}...')
+            job.message = dispatch.process_file(job.file_path, progress=job.progress, cancel=job.cancel_event,
+                                                **job.options)
+            job.status = 'done'
+        except dispatch.ImportCancelled as e:
+            job.status, job.message = 'cancelled', str(e)
+        except Exception as e:
+            job.status, job.message = 'failed', f'Error: {e}'
+        print(job.message)
+        job.progress.finish(job.message)
+
+    # Cancel everything queued or running and let the workers exit
+    def shutdown(self):
+        with self.lock:
+            for job in self.submitted:
+                job.cancel()
+            for _ in self.threads:
+                self.jobs.put(None)
+            self.threads = []
@@ -3,9 +3,10 @@
 from tkinter import *
 import customtkinter as ctk
 from tkinter import filedialog
-from contact_process import ContactConverter
-from company_process import CompanyConverter
-from jobList_process import ProjectListConverter
+import dispatch
+from job_queue import JobManager
+from progress import ProgressMeter
+import os
 import threading
 import time
 
@@ -17,38 +18,77 @@ ctk.set_window_scaling(1.5)
 
 
 class Popover(ctk.CTkToplevel):
-    def __init__(self, master, **kwags):
+    def __init__(self, master, job, **kwags):
         super().__init__(master, **kwags)
         self.title("Process Status")
-        self.geometry("300x100")
+        self.geometry("300x140")
         self.progressbar = ctk.CTkProgressBar(self, width=250, height=10, corner_radius=5, mode='determinate')
         self.progressbar.pack(padx=10, pady=10)
         
         self.label = ctk.CTkLabel(self, font=("Aptos", 14))
         self.label.pack(padx=10, pady=10)
         
-        self.button = ctk.CTkButton(self, text="Close", command=self.on_close)
+        self.button = ctk.CTkButton(self, text="Cancel", command=self.on_cancel)
         self.button.pack(padx=10, pady=10)
-        self.button.configure(state='disabled')
-        self.button._fg_color = 'white'
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Import shown by this window, its progress queue is drained by poll() on the Tk thread
+        self.job = job
+        self.meter = ProgressMeter()
+        self.started = False
+        self.closed = False
     
     def message(self, message):
         self.progressbar.stop()
         self.label.configure(text=message)
         self.transient(self.master)
-        self.button.configure(state='normal')
+        self.button.configure(text="Close", command=self.on_close, state='normal')
         self.button._fg_color = '#007bff'
-        self.grab_set()
-        self.wait_window()
         
     def loadStart(self, message):
         self.label.configure(text=message)
+        self.progressbar.configure(mode='indeterminate')
         self.progressbar.start()
 
+    # Show the job's latest progress, returns False once its final message is shown
+    def poll(self):
+        if self.closed:
+            return False
+        if self.job.status == 'running' and not self.started:
+            self.started = True
+            self.loadStart('Processing Data...')
+
+        events, finished = self.job.progress.drain()
+        for event in events if not self.job.cancel_event.is_set() else []:
+            self.updateProgress(*self.meter.update(event))
+        if finished:
+            self.message(self.job.progress.result)
+            return False
+        return True
+
+    # value is the completed fraction, None while the total is still unknown
     def updateProgress(self, value, message):
-        self.progressbar.set(value, message)
+        if value is None:
+            if self.progressbar.cget('mode') != 'indeterminate':
+                self.progressbar.configure(mode='indeterminate')
+                self.progressbar.start()
+        else:
+            if self.progressbar.cget('mode') != 'determinate':
+                self.progressbar.stop()
+                self.progressbar.configure(mode='determinate')
+            self.progressbar.set(value)
+        self.label.configure(text=message)
+
+    # Cancellation is cooperative, the import stops once its in-flight batches are done
+    def on_cancel(self):
+        self.job.cancel()
+        self.button.configure(state='disabled')
+        self.label.configure(text='Cancelling...')
         
     def on_close(self):
+        if not self.job.finished:
+            self.job.cancel()
+        self.closed = True
         self.destroy()
 
 
@@ -78,59 +118,36 @@ class Body(ctk.CTkLabel):
         # Exit button
         self.exit_button = ctk.CTkButton(self, text_color='white', text="Exit", fg_color='#b22222', hover_color='darkgray', height=30, command=self.on_close)
         self.exit_button.grid(row=1, column=0, padx=10, pady=5, sticky="ew")
+
+        # Queued and running imports, and the status windows showing them
+        self.jobs = JobManager()
+        self.popovers = []
     
     def run_program(self):
         file_path = filedialog.askopenfilename()
         if file_path: 
-            self.popover = Popover(master=self)
-            self.popover.loadStart('Processing Data...')
-            thread = threading.Thread(target=self.process_file, args=(file_path,))
-            thread.start()
-        
-    def process_file(self, file_path):
-        if 'Contacts' in file_path:
-            try:
-                print('Processing Contact Data...')
-                contact_converter = ContactConverter(csv_file=file_path, json_file='StockContacts.json')
-                contact_converter.run()  # Run the conversion process
-                message = 'Contacts processed successfully'
-                print(message)
-                self.after(1000, self.popover.message(message)) 
-            except Exception as e:
-                message = f'Error: {e}'
-                print(message)
-                return message
-        if 'Companies' in file_path:
-            try:
-                company_converter = CompanyConverter(csv_file=file_path, json_file='StockCompanies.json')
-                company_converter.run()  # Run the conversion process
-                message = 'Companies updated processed successfully'
-                print(message)
-                self.after(1000, self.popover.message(message)) 
-            except Exception as e:
-                message = f'Error: {e}'
-                print(message)
-                return message           
-        
-        if '.docx' in file_path:
-            try:
-                project_list_converter = ProjectListConverter(docx_file=file_path, csv_file='projectList.csv', json_file='projectList.json')
-                project_list_converter.run()
-                message= 'Project List converted successfully'
-                print(message)
-                self.after(1000, self.popover.message(message))
-            except Exception as e:
-                message = f'Error: {e}'
-                print(message)
-                return message            
-    
+            # Imports run one at a time on the job manager's worker, later files wait in the queue
+            job = self.jobs.submit(file_path)
+            popover = Popover(master=self, job=job)
+            popover.loadStart('Waiting for the previous import...' if len(self.popovers) else 'Processing Data...')
+            if not self.popovers:
+                self.after(100, self.poll_jobs)
+            self.popovers.append(popover)
+
+    # Update every open Popover on the Tk thread, the workers only post to their job's queue
+    def poll_jobs(self):
+        self.popovers = [popover for popover in self.popovers if popover.poll()]
+        if self.popovers:
+            self.after(100, self.poll_jobs)
+
     def on_close(self):
+        self.jobs.shutdown()
         self.quit()
         self.destroy()
 
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, warm_up: bool = True):
         super().__init__()
         
         # Configure Window
@@ -144,10 +161,16 @@ class App(ctk.CTk):
         
         self.button_frame = Body(master=self)
         self.button_frame.grid(padx=20, pady=20, sticky="ew")
-        
 
+        # Converters and pandas are imported on first use, optionally preloaded once the window is shown
+        if warm_up:
+            self.after(500, self.warm_up)
+
+    def warm_up(self):
+        threading.Thread(target=dispatch.warm_up, daemon=True).start()
 
 
 if __name__ == "__main__":
-    app = App()
+    # SIGPARSER_WARM_UP=0 skips preloading the converters in the background
+    app = App(warm_up=os.getenv('SIGPARSER_WARM_UP', '1') != '0')
     app.mainloop()
\ No newline at end of file
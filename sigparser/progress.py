@@ -0,0 +1,69 @@
+# progress.py
+
+import queue
+import time
+from collections import namedtuple
+
+# One progress update from a converter: `done` of `total` rows (total is None when unknown)
+# and, while uploading, the number of batches sent so far
+ProgressEvent = namedtuple('ProgressEvent', ['stage', 'done', 'total', 'batches', 'time'])
+
+
+# Thread-safe channel from a converter's worker thread to the GUI
+# Converters call it like a callback, the Tk thread drains it with after() polling
+class ProgressQueue:
+    def __init__(self):
+        self.events = queue.Queue()
+        self.result = None
+
+    def __call__(self, stage: str, done: int, total: int = None, batches: int = None):
+        self.events.put(ProgressEvent(stage, done, total, batches, time.monotonic()))
+
+    # Final message of the run, picked up by the Tk thread on its next poll
+    def finish(self, message: str):
+        self.result = message
+        self.events.put(None)
+
+    # Return every event posted since the last call without blocking
+    # Only the latest event per stage matters, older ones are dropped
+    def drain(self):
+        latest = {}
+        finished = False
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return list(latest.values()), finished
+            if event is None:
+                finished = True
+            else:
+                latest.pop(event.stage, None)
+                latest[event.stage] = event
+
+
+# Turns progress events into a bar fraction and a throughput/ETA message
+class ProgressMeter:
+    def __init__(self):
+        self.started = {}
+
+    def update(self, event: ProgressEvent):
+        start = self.started.setdefault(event.stage, (event.time, event.done))
+        elapsed = event.time - start[0]
+        rate = (event.done - start[1]) / elapsed if elapsed > 0 else 0
+
+        message = f"{event.stage}: {event.done:,}" + (f" / {event.total:,}" if event.total else '') + " rows"
+        if event.batches is not None:
+            message += f", {event.batches} batches"
+        if rate:
+            message += f"\n{rate:,.0f} rows/s"
+
+        if not event.total:
+            return None, message
+        if rate and event.done < event.total:
+            message += f", ETA {format_seconds((event.total - event.done) / rate)}"
+        return min(event.done / event.total, 1.0), message
+
+
+def format_seconds(seconds: float):
+    minutes, seconds = divmod(int(seconds + 0.5), 60)
+    return f"{minutes}:{seconds:02d}"
@@ -0,0 +1,28 @@
+# record_diff.py
+
+
+# Normalize a value so the server and CSV representations compare equal
+def normalize(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return str(value).lower()
+    return str(value).strip()
+
+
+# Columns of a record whose value differs from the server row
+def changed_columns(record, server_row, key):
+    return [
+        col for col, value in record.items()
+        if col != key and col in server_row and normalize(value) != normalize(server_row[col])
+    ]
+
+
+# Reduce records to the ones that differ from the server
+# Changed records go out whole: an upsert checks NOT NULL columns on the row it would insert,
+# so a record cut down to its changed columns can be rejected even though the row exists
+def changed_records(records, server_rows, key):
+    return [
+        record for record in records
+        if record.get(key) in server_rows and changed_columns(record, server_rows[record.get(key)], key)
+    ]
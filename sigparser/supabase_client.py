@@ -0,0 +1,56 @@
+# supabase_client.py
+
+import os
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# One client per process so every converter reuses the same pooled keep-alive connections
+client = None
+client_lock = threading.Lock()
+
+
+# Create the shared Supabase client on first network use
+def get_client(max_connections: int = 20, keepalive_expiry: float = 60.0):
+    global client
+    if client is None:
+        with client_lock:
+            if client is None:
+                client = create_pooled_client(max_connections, keepalive_expiry)
+    return client
+
+
+def create_pooled_client(max_connections, keepalive_expiry):
+    # SUPABASE_BACKEND=fake points every converter at the in-process stand-in for offline load tests
+    if os.getenv('SUPABASE_BACKEND', '').lower() == 'fake':
+        from fake_supabase import FakeSupabase
+        print("Using the in-process fake Supabase backend")
+        return FakeSupabase.from_env()
+
+    import httpx
+    from supabase import create_client
+    from supabase.lib.client_options import SyncClientOptions
+
+    supabase_url: str = os.getenv('SUPABASE_URL')
+    supabase_key: str = os.getenv('SERVICE_ROLE_KEY')
+
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=keepalive_expiry,
+    )
+    # SUPABASE_GZIP=1 compresses upload bodies, for gateways that accept Content-Encoding: gzip
+    transport = None
+    if os.getenv('SUPABASE_GZIP', '').lower() in ('1', 'true'):
+        from gzip_transport import GzipTransport
+        transport = GzipTransport(limits=limits)
+
+    http_client = httpx.Client(
+        limits=limits,
+        transport=transport,
+        timeout=httpx.Timeout(120.0),
+        follow_redirects=True,
+    )
+    print("Connecting to Supabase")
+    return create_client(supabase_url, supabase_key, options=SyncClientOptions(httpx_client=http_client))
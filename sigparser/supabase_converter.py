@@ -0,0 +1,306 @@
+# supabase_converter.py
+
+from collections import Counter
+from supabase_client import get_client
+from dtypes import records
+from upload_executor import AdaptiveBatcher, UploadExecutor
+from instrumentation import InstrumentedClient, RunReport, timed_stage
+from record_diff import changed_records
+from frame_cache import FrameCache
+from sync_state import CheckpointJournal, FingerprintStore, KeyMirror
+
+
+# Upload and sync-state machinery shared by the converters, which only read and clean their source file
+# Subclasses set the table they sync to and hand processed frames to upload() or upload_chunks()
+class SupabaseConverter:
+    batch_size = 500
+
+    # Most keys per in_ lookup, which puts every key in the request URL, whatever size batches grow to
+    lookup_size = 500
+
+    # Table the records are synced to, also the name of their run reports, cache and sync state
+    table = None
+
+    # Table of records deleted in the app, whose rows are still updated but never re-inserted
+    deleted_table = None
+
+    # Column that identifies a record
+    key = 'uid'
+
+    # Only server rows with this column set are updated, None updates every row
+    allow_column = None
+
+    # Whether records already on the server are upserted when they changed, or are only counted
+    update_existing = True
+
+    # Name of the records in the upload summary, e.g. 'Contacts'
+    label = None
+
+    def __init__(self, concurrency: int = 4, state_file: str = 'sync_state.db', progress=None, cancel=None,
+                 cache_dir: str = 'cache'):
+        # Supabase client, connected lazily so reading the source file can start right away
+        self.client = None
+
+        # Optional callback(stage, done, total, batches) for rows processed and batches uploaded
+        self.progress = progress
+
+        # Set from another thread to stop the run between chunks and batches
+        self.cancel = cancel
+
+        # Stage timings, request counts and payload sizes, saved as JSON at the end of run()
+        self.report = RunReport(self.table)
+
+        # Runs lookups and upserts for up to `concurrency` batches at once
+        self.executor = UploadExecutor(max_workers=concurrency, report=self.report)
+
+        # Records per batch, starting at batch_size and tuned by payload bytes and latency while uploading
+        self.batcher = AdaptiveBatcher(initial=self.batch_size)
+
+        # Fingerprints of uploaded rows so unchanged records are never re-sent
+        self.fingerprints = FingerprintStore(state_file, self.table, self.key) if state_file else None
+
+        # Keys of every batch the server accepted, so a failed or interrupted import resumes where it stopped
+        self.checkpoints = CheckpointJournal(state_file, self.table, self.key) if state_file else None
+
+        # Local copies of the keys in table and deleted_table, so batches are classified without asking the server
+        where = {self.allow_column: True} if self.allow_column else None
+        self.mirrors = {
+            table: KeyMirror(state_file, table, self.key, where)
+            for table in (self.table, self.deleted_table) if table
+        } if state_file else None
+
+        # Cleaned frames cached as Parquet, so re-processing an unchanged source file is a single read
+        self.cache = FrameCache(cache_dir, self.table, self.transform_version) if cache_dir else None
+
+        # Delta imports set a WatermarkStore, saved with the rest of the sync state
+        self.watermarks = None
+
+    # Shared pooled Supabase client, created on first network use
+    @property
+    def supabase(self):
+        if self.client is None:
+            self.client = get_client()
+        return InstrumentedClient(self.client, self.report, self.batcher.record_bytes)
+
+    # Report progress to the caller, e.g. the GUI's ProgressQueue
+    def notify(self, stage, done, total=None, batches=None):
+        if self.progress is not None:
+            self.progress(stage, done, total, batches)
+
+    # cancel is an optional threading.Event checked between chunks and batches
+    def cancelled(self):
+        return self.cancel is not None and self.cancel.is_set()
+
+    # Stop handing out batches once cancelled, batches already sent still finish and are counted
+    def until_cancelled(self, batches):
+        for batch in batches:
+            if self.cancelled():
+                return
+            yield batch
+
+    # Start an import of input_file, resuming after the batches an interrupted run already uploaded
+    def begin_sync(self, input_file):
+        if self.checkpoints is not None:
+            self.checkpoints.begin(input_file)
+
+    # Upload a processed frame, returns whether every batch was uploaded
+    def upload(self, data):
+        data = self.skip_checkpointed(self.filter_unchanged(data))
+        return self.upload_batches(self.to_batches(data), len(data))
+
+    # Upload each processed chunk as it is produced so memory stays flat
+    def upload_chunks(self, frames):
+        return self.upload_batches(
+            batch for data in frames for batch in self.to_batches(self.skip_checkpointed(self.filter_unchanged(data)))
+        )
+
+    def upload_batches(self, batches, total=None):
+        self.refresh_mirrors()
+        uploaded = self.upload_to_supabase(batches, total)
+        self.commit_sync_state(uploaded)
+        return uploaded
+
+    # Convert processed rows into batches of upload records
+    # Each batch takes the batcher's current size, which adapts to payload size and upload latency
+    def to_batches(self, data):
+        i = 0
+        while i < len(data):
+            size = self.batcher.size
+            with self.report.stage('serialize', min(size, len(data) - i)):
+                batch = records(data.iloc[i:i + size])
+            i += size
+            yield batch
+
+    # Bring the key mirrors up to date before uploading, without any request while they are within their TTL
+    @timed_stage('mirror')
+    def refresh_mirrors(self):
+        if self.mirrors is None:
+            return
+        try:
+            for mirror in self.mirrors.values():
+                mirror.refresh(self.supabase, self.executor.call)
+        except Exception as e:
+            print(f"Unable to refresh the key mirrors, looking up every batch instead. {e}")
+            self.mirrors = None
+
+    # The keys of a batch to look up in table: all of them without mirrors, otherwise those the table holds
+    def known_keys(self, table, keys):
+        if table is None:
+            return []
+        return keys if self.mirrors is None else self.mirrors[table].known(keys)
+
+    # Server rows for the keys of a batch in table and deleted_table
+    # With mirrors only keys they list are fetched, and none at all when existing records are only counted.
+    # A listed key the server no longer returns may have moved to the other table since the last refresh,
+    # so it is looked up there live before it counts as new
+    def fetch_existing(self, keys, columns):
+        known = self.known_keys(self.table, keys)
+        deleted_known = self.known_keys(self.deleted_table, keys)
+        if self.mirrors is not None and not self.update_existing:
+            return dict.fromkeys(known), dict.fromkeys(deleted_known)
+
+        rows = self.fetch_rows(self.table, known, columns)
+        deleted_rows = self.fetch_rows(self.deleted_table, deleted_known, columns)
+        if self.mirrors is None or self.deleted_table is None:
+            return rows, deleted_rows
+
+        stale = [key for key in known if key not in rows]
+        deleted_stale = [key for key in deleted_known if key not in deleted_rows]
+        if stale or deleted_stale:
+            moved = self.fetch_rows(self.deleted_table, [key for key in stale if key not in deleted_rows], columns)
+            restored = self.fetch_rows(self.table, [key for key in deleted_stale if key not in rows], columns)
+            deleted_rows.update(moved)
+            rows.update(restored)
+            self.mirrors[self.table].discard(stale)
+            self.mirrors[self.deleted_table].discard(deleted_stale)
+            self.mirrors[self.table].add(restored)
+            self.mirrors[self.deleted_table].add(moved)
+        return rows, deleted_rows
+
+    # Fetch the server rows for the keys in a batch, limited to rows that allow updates
+    # Keys are looked up lookup_size at a time so the URL stays within server limits
+    def fetch_rows(self, table, keys, columns):
+        def request(chunk):
+            query = self.supabase.table(table).select(', '.join(columns)).in_(self.key, chunk)
+            if self.allow_column:
+                query = query.eq(self.allow_column, True)
+            return query.execute().data
+
+        rows = {}
+        for i in range(0, len(keys), self.lookup_size):
+            result = self.executor.call(lambda: request(keys[i:i + self.lookup_size]))
+            rows.update((row[self.key], row) for row in result or [])
+        return rows
+
+    # Upsert only the rows that differ from the server copy, each as the full record
+    def upload_changes(self, table, records, server_rows):
+        changed = changed_records(records, server_rows, self.key)
+        if len(changed) > 0:
+            self.executor.call(lambda: self.supabase.table(table).upsert(changed).execute())
+            print(f"Updated {len(changed)} records in {table}")
+        return len(changed)
+
+    # Classify one batch against the database, insert its new records and apply changes
+    def upload_batch(self, json_data):
+        keys = [record.get(self.key) for record in json_data if record.get(self.key)]
+        # Records that are only counted need nothing but their key from the server
+        columns = list(json_data[0].keys()) if self.update_existing else [self.key]
+        rows, deleted_rows = self.fetch_existing(keys, columns)
+
+        # Separate new records and updates
+        new_records = []
+        updates = []
+        deleted_updates = []
+
+        for record in json_data:
+            key = record.get(self.key)
+            if key in rows:
+                updates.append(record)
+            elif key in deleted_rows:
+                deleted_updates.append(record)
+            else:
+                new_records.append(record)
+
+        if len(new_records) > 0:
+            self.executor.call(lambda: self.supabase.table(self.table).upsert(new_records).execute())
+            print(f"Inserted {len(new_records)} records")
+            if self.mirrors is not None:
+                self.mirrors[self.table].add(record[self.key] for record in new_records if record.get(self.key))
+
+        counts = Counter(new=len(new_records), updates=len(updates), deleted_updates=len(deleted_updates))
+        if self.update_existing:
+            counts['changed'] = self.upload_changes(self.table, updates, rows)
+            counts['deleted_changed'] = self.upload_changes(self.deleted_table, deleted_updates, deleted_rows)
+        return counts
+
+    # Upload batches of records to Supabase, several batches at a time
+    # total is the number of records to upload when known, for progress reporting
+    @timed_stage('upload')
+    def upload_to_supabase(self, batches, total=None):
+        total_records = 0
+        totals = Counter()
+        failed_batches = 0
+
+        for index, json_data, result, error in self.executor.map(self.batcher.track(self.upload_batch), self.until_cancelled(batches)):
+            total_records += len(json_data)
+            self.notify('Uploading', total_records, total, index + 1)
+            if error is not None:
+                failed_batches += 1
+                print(f"Error: Unable to upload batch {index + 1}. {error}")
+                print(f"Batch Data: {json_data[-1]}")
+                continue
+            totals.update(result)
+            if self.checkpoints is not None:
+                self.checkpoints.record(json_data)
+
+        self.report.count('records_uploaded', total_records)
+        self.report.count('batches_failed', failed_batches)
+        for name, value in totals.items():
+            self.report.count(f'records_{name}', value)
+
+        # Print the results
+        print(f'New {self.label} Found: {totals["new"]}')
+        if self.update_existing:
+            print(f'Updates to {self.table}: {totals["changed"]} changed of {totals["updates"]} existing')
+            if self.deleted_table:
+                print(f'Updates to {self.deleted_table}: {totals["deleted_changed"]} changed of {totals["deleted_updates"]} existing')
+        else:
+            print(f'Potential Updates to {self.label}: {totals["updates"]}')
+        if totals['new'] == 0:
+            print('No new records to add')
+
+        if self.cancelled():
+            print(f"Upload cancelled after {total_records} records")
+            return False
+
+        if failed_batches > 0:
+            print(f"Error: {failed_batches} batches failed to upload")
+            return False
+
+        print(f"Uploaded {total_records} records to the database\nProcess Completed Successfully")
+        return True
+
+    # Drop rows that an earlier run already uploaded unchanged
+    @timed_stage('fingerprint')
+    def filter_unchanged(self, data):
+        if self.fingerprints is None:
+            return data
+        return self.fingerprints.filter_changed(data)
+
+    # Drop rows an interrupted run on the same file already uploaded
+    def skip_checkpointed(self, data):
+        if self.checkpoints is None:
+            return data
+        return self.checkpoints.filter_committed(data)
+
+    # Save fingerprints and the watermark and clear the checkpoint journal only once the whole upload succeeded
+    def commit_sync_state(self, uploaded):
+        if self.fingerprints is not None:
+            if uploaded:
+                self.fingerprints.commit()
+            else:
+                self.fingerprints.discard()
+        if self.watermarks is not None and uploaded:
+            self.watermarks.commit()
+        if self.checkpoints is not None and uploaded:
+            self.checkpoints.finish()
@@ -0,0 +1,336 @@
+# sync_state.py
+
+import hashlib
+import sqlite3
+import time
+from contextlib import closing
+import pandas as pd
+
+
+class FingerprintStore:
+    def __init__(self, db_file: str, source: str, key: str):
+        self.db_file = db_file
+        self.source = source  # Table the records are synced to, e.g. 'contacts'
+        self.key = key  # Column that identifies a record, e.g. 'uid'
+
+        # Fingerprints of rows handed to the uploader, saved once the upload succeeds
+        self.pending = {}
+        self.stored = None
+
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS fingerprints '
+                '(source TEXT NOT NULL, key TEXT NOT NULL, hash TEXT NOT NULL, PRIMARY KEY (source, key))'
+            )
+
+    def connect(self):
+        return sqlite3.connect(self.db_file)
+
+    # Stable hash of every processed row, independent of column dtypes, with nulls hashed as empty strings
+    def fingerprint(self, data):
+        text = data.astype(object).where(data.notna(), '')
+        return pd.util.hash_pandas_object(text.astype(str), index=False).astype(str)
+
+    def load(self):
+        if self.stored is None:
+            with closing(self.connect()) as conn:
+                rows = conn.execute('SELECT key, hash FROM fingerprints WHERE source = ?', (self.source,)).fetchall()
+            self.stored = dict(rows)
+        return self.stored
+
+    # Keep only rows that are new or changed since the last successful upload
+    def filter_changed(self, data):
+        hashes = self.fingerprint(data)
+        keys = data[self.key].astype(str)
+        changed = keys.map(self.load()).ne(hashes)
+
+        self.pending.update(zip(keys[changed], hashes[changed]))
+        print(f"{int(changed.sum())} of {len(data)} records are new or changed since the last sync")
+        return data[changed]
+
+    # Record the fingerprints of the uploaded rows
+    def commit(self):
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO fingerprints (source, key, hash) VALUES (?, ?, ?)',
+                [(self.source, key, value) for key, value in self.pending.items()]
+            )
+        self.load().update(self.pending)
+        print(f"Saved fingerprints for {len(self.pending)} records")
+        self.pending.clear()
+
+    # Forget rows handed out since the last commit, e.g. after a failed upload
+    def discard(self):
+        self.pending.clear()
+
+
+class WatermarkStore:
+    def __init__(self, db_file: str, source: str):
+        self.db_file = db_file
+        self.source = source
+
+        # Newest date seen during this run, saved once the upload succeeds
+        self.latest = None
+        self.saved = None
+
+        with closing(self.connect()) as conn, conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS watermarks (source TEXT PRIMARY KEY, value TEXT NOT NULL)')
+
+    def connect(self):
+        return sqlite3.connect(self.db_file)
+
+    # High-water mark of the last successful run, or None on the first run
+    def load(self):
+        if self.saved is None:
+            with closing(self.connect()) as conn:
+                row = conn.execute('SELECT value FROM watermarks WHERE source = ?', (self.source,)).fetchone()
+            self.saved = pd.Timestamp(row[0]) if row else pd.NaT
+        return None if pd.isna(self.saved) else self.saved
+
+    # Keep rows dated on or after the watermark; rows without a usable date are always kept
+    # Export dates only have day precision, so a row updated later on the watermark day carries the same date
+    # and is kept; the fingerprint store drops it again if it did not change
+    def filter_newer(self, data, dates, full=False):
+        newest = dates.max()
+        if pd.notna(newest) and (self.latest is None or newest > self.latest):
+            self.latest = newest
+
+        watermark = None if full else self.load()
+        if watermark is None:
+            return data
+
+        keep = dates.isna() | (dates >= watermark)
+        print(f"Delta import: skipped {int((~keep).sum())} records dated before {watermark.date()}")
+        return data[keep]
+
+    # Save the newest date seen as the watermark for the next run
+    def commit(self):
+        if self.latest is None:
+            return
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO watermarks (source, value) VALUES (?, ?)',
+                (self.source, self.latest.isoformat())
+            )
+        self.saved = self.latest
+        print(f"Saved watermark {self.latest.date()} for {self.source}")
+
+
+# Content hash of an input file, so a re-run on the same export finds its checkpoints again
+def file_digest(path: str, block_size: int = 1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CheckpointJournal:
+    def __init__(self, db_file: str, source: str, key: str):
+        self.db_file = db_file
+        self.source = source
+        self.key = key
+
+        # Digest of the file being imported and the keys an earlier, interrupted run already uploaded
+        self.run_key = None
+        self.resumed = set()
+
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS checkpoints '
+                '(source TEXT NOT NULL, run_key TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (source, run_key, key))'
+            )
+
+    def connect(self):
+        return sqlite3.connect(self.db_file)
+
+    # Start journaling an import of input_file, loading what a previous attempt got through
+    def begin(self, input_file: str):
+        try:
+            self.run_key = file_digest(input_file)
+        except OSError:
+            self.run_key = None
+            self.resumed = set()
+            return
+        with closing(self.connect()) as conn:
+            rows = conn.execute('SELECT key FROM checkpoints WHERE source = ? AND run_key = ?',
+                                (self.source, self.run_key)).fetchall()
+        self.resumed = {row[0] for row in rows}
+        if self.resumed:
+            print(f"Resuming an interrupted import, {len(self.resumed)} records were already uploaded")
+
+    # Drop rows that an interrupted run on the same file already uploaded
+    def filter_committed(self, data):
+        if not self.resumed:
+            return data
+        keep = ~data[self.key].astype(str).isin(self.resumed)
+        print(f"Skipped {int((~keep).sum())} records uploaded before the interruption")
+        return data[keep]
+
+    # Append the keys of a batch the server accepted, right away so a crash cannot lose them
+    def record(self, records):
+        if self.run_key is None:
+            return
+        keys = {str(record[self.key]) for record in records}
+        with closing(self.connect()) as conn, conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO checkpoints (source, run_key, key) VALUES (?, ?, ?)',
+                [(self.source, self.run_key, key) for key in keys]
+            )
+
+    # The import completed, so its journal and any left by older files are no longer needed
+    def finish(self):
+        with closing(self.connect()) as conn, conn:
+            conn.execute('DELETE FROM checkpoints WHERE source = ?', (self.source,))
+        self.resumed = set()
+
+
+# Local copy of the keys a Supabase table holds, so batches are classified without asking the server
+# where maps columns to the value a row needs to count, e.g. {'allow_sigparser': True}.
+# Within ttl seconds of the last refresh the copy is used as is; after that only rows whose
+# changed_column moved past the newest value seen are paged in, and the whole set is reloaded
+# every max_age seconds, or whenever the table has no changed_column, to drop deleted rows.
+class KeyMirror:
+    def __init__(self, db_file: str, source: str, key: str, where=None, ttl: float = 3600,
+                 max_age: float = 7 * 24 * 3600, changed_column: str = 'updated_at', page_size: int = 1000):
+        self.db_file = db_file
+        self.source = source
+        self.key = key
+        self.where = where or {}
+        self.ttl = ttl
+        self.max_age = max_age
+        self.changed_column = changed_column
+        self.page_size = page_size
+
+        self.keys = None
+
+        with closing(self.connect()) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS mirror_keys '
+                '(source TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (source, key))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS mirrors '
+                '(source TEXT PRIMARY KEY, loaded_at REAL NOT NULL, refreshed_at REAL NOT NULL, cursor TEXT)'
+            )
+
+    def connect(self):
+        return sqlite3.connect(self.db_file)
+
+    def load(self):
+        if self.keys is None:
+            with closing(self.connect()) as conn:
+                rows = conn.execute('SELECT key FROM mirror_keys WHERE source = ?', (self.source,)).fetchall()
+            self.keys = {row[0] for row in rows}
+        return self.keys
+
+    # Bring the mirror up to date, client is the Supabase client and call wraps each request, e.g. with retries
+    def refresh(self, client, call=lambda request: request()):
+        with closing(self.connect()) as conn:
+            state = conn.execute('SELECT loaded_at, refreshed_at, cursor FROM mirrors WHERE source = ?',
+                                 (self.source,)).fetchone()
+        now = time.time()
+        if state is not None and now - state[1] < self.ttl:
+            self.load()
+            return
+
+        if state is None or state[2] is None or now - state[0] >= self.max_age:
+            self.reload(client, call, now)
+        else:
+            self.update(client, call, now, state[2])
+
+    # Page through rows ordered by key, select is the column list and filters adds conditions to each query
+    def pages(self, client, call, select, filters):
+        start = 0
+        while True:
+            query = filters(client.table(self.source).select(select))
+            rows = call(lambda: query.order(self.key).range(start, start + self.page_size - 1).execute().data) or []
+            yield rows
+            if len(rows) < self.page_size:
+                return
+            start += self.page_size
+
+    def matches(self, row):
+        return all(row.get(column) == value for column, value in self.where.items())
+
+    def filtered(self, query):
+        for column, value in self.where.items():
+            query = query.eq(column, value)
+        return query
+
+    # Replace the mirror with every matching key on the server
+    def reload(self, client, call, now):
+        columns = [self.key] + ([self.changed_column] if self.changed_column else [])
+        keys = set()
+        cursor = None
+        try:
+            for rows in self.pages(client, call, ', '.join(columns), self.filtered):
+                keys.update(str(row[self.key]) for row in rows)
+                if self.changed_column:
+                    stamps = [str(row[self.changed_column]) for row in rows if row.get(self.changed_column)]
+                    cursor = max([cursor or '', *stamps]) or None
+        except Exception as e:
+            if not self.changed_column:
+                raise
+            # The table has no changed_column, so every refresh reloads the key set instead
+            print(f"Unable to page {self.source} by {self.changed_column} ({e}), mirroring keys only")
+            self.changed_column = None
+            return self.reload(client, call, now)
+
+        with closing(self.connect()) as conn, conn:
+            conn.execute('DELETE FROM mirror_keys WHERE source = ?', (self.source,))
+            conn.executemany('INSERT OR IGNORE INTO mirror_keys (source, key) VALUES (?, ?)',
+                             [(self.source, key) for key in keys])
+            conn.execute('INSERT OR REPLACE INTO mirrors (source, loaded_at, refreshed_at, cursor) VALUES (?, ?, ?, ?)',
+                         (self.source, now, now, cursor))
+        self.keys = keys
+        print(f"Mirrored {len(keys)} {self.source} keys")
+
+    # Apply only the rows changed since cursor, adding keys that now match and dropping those that no longer do
+    def update(self, client, call, now, cursor):
+        columns = [self.key, self.changed_column, *self.where]
+        added = set()
+        removed = set()
+        newest = cursor
+        for rows in self.pages(client, call, ', '.join(dict.fromkeys(columns)),
+                               lambda query: query.gt(self.changed_column, cursor)):
+            for row in rows:
+                (added if self.matches(row) else removed).add(str(row[self.key]))
+                if row.get(self.changed_column):
+                    newest = max(newest, str(row[self.changed_column]))
+
+        with closing(self.connect()) as conn, conn:
+            conn.executemany('INSERT OR IGNORE INTO mirror_keys (source, key) VALUES (?, ?)',
+                             [(self.source, key) for key in added])
+            conn.executemany('DELETE FROM mirror_keys WHERE source = ? AND key = ?',
+                             [(self.source, key) for key in removed])
+            conn.execute('UPDATE mirrors SET refreshed_at = ?, cursor = ? WHERE source = ?', (now, newest, self.source))
+        keys = self.load()
+        keys.update(added)
+        keys.difference_update(removed)
+        print(f"Refreshed {self.source} mirror, {len(added)} keys added and {len(removed)} removed")
+
+    # The keys among `keys` that the table holds
+    def known(self, keys):
+        mirrored = self.load()
+        return [key for key in keys if str(key) in mirrored]
+
+    # Remember keys this run inserted, so the next run classifies them without a refresh
+    def add(self, keys):
+        keys = {str(key) for key in keys}
+        if not keys:
+            return
+        with closing(self.connect()) as conn, conn:
+            conn.executemany('INSERT OR IGNORE INTO mirror_keys (source, key) VALUES (?, ?)',
+                             [(self.source, key) for key in keys])
+        self.load().update(keys)
+
+    # Forget keys the server no longer holds, e.g. rows moved to another table since the last refresh
+    def discard(self, keys):
+        keys = {str(key) for key in keys}
+        if not keys:
+            return
+        with closing(self.connect()) as conn, conn:
+            conn.executemany('DELETE FROM mirror_keys WHERE source = ? AND key = ?',
+                             [(self.source, key) for key in keys])
+        self.load().difference_update(keys)
@@ -0,0 +1,7 @@
+# conftest.py
+# The converters import each other as top-level modules, so tests run with sigparser/ on the path
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
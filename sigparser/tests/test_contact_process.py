@@ -0,0 +1,36 @@
+# test_contact_process.py
+
+import numpy as np
+import pandas as pd
+
+from contact_process import ContactConverter
+
+DATE_COLUMN = 'Date Last Updated (Details)'
+
+
+def converter():
+    return ContactConverter('Contacts.csv', 'Contacts.json', state_file=None, cache_dir=None)
+
+
+def test_format_date_converts_to_iso():
+    data = pd.DataFrame({DATE_COLUMN: ['Jan 05 2024', None, 'Mar 17 2023', 'Jan 05 2024']})
+    result = converter().format_date(data, [DATE_COLUMN])
+    assert result[DATE_COLUMN].tolist() == ['2024-01-05', None, '2023-03-17', '2024-01-05']
+
+
+def test_format_date_all_null_column():
+    data = pd.DataFrame({DATE_COLUMN: [np.nan, np.nan, np.nan]})
+    result = converter().format_date(data, [DATE_COLUMN])
+    assert result[DATE_COLUMN].tolist() == [None, None, None]
+
+
+def test_format_date_empty_frame():
+    data = pd.DataFrame({DATE_COLUMN: pd.Series([], dtype=object)})
+    result = converter().format_date(data, [DATE_COLUMN])
+    assert result[DATE_COLUMN].tolist() == []
+
+
+def test_format_date_unparseable_dates_become_none():
+    data = pd.DataFrame({DATE_COLUMN: ['not a date', 'Feb 30 2024', 'Jun 01 2022', None]})
+    result = converter().format_date(data, [DATE_COLUMN])
+    assert result[DATE_COLUMN].tolist() == [None, None, '2022-06-01', None]
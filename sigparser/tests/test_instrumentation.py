@@ -0,0 +1,22 @@
+# test_instrumentation.py
+
+import json
+
+from instrumentation import RunReport, payload_size
+
+
+def test_payload_size_scales_the_sample_to_every_record():
+    records = [{'uid': f'{i:04d}', 'email': 'someone@example.com'} for i in range(100)]
+    assert abs(payload_size(records, sample_size=10) - len(json.dumps(records))) < len(json.dumps(records)) * 0.05
+    assert payload_size(records, record_bytes=50.0) == 5000
+
+
+def test_finish_reports_an_unwritable_report_dir_without_raising(tmp_path, monkeypatch, capsys):
+    blocker = tmp_path / 'blocker'
+    blocker.write_text('')
+    monkeypatch.setenv('SIGPARSER_REPORT_DIR', str(blocker / 'reports'))
+    monkeypatch.setenv('SIGPARSER_PROFILE', 'cprofile')
+    report = RunReport('contacts')
+    report.start()
+    report.finish()
+    assert 'Unable to write run report' in capsys.readouterr().out
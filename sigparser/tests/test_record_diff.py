@@ -0,0 +1,16 @@
+# test_record_diff.py
+
+from record_diff import changed_records
+
+
+def test_changed_records_are_sent_whole():
+    records = [
+        {'uid': 'a', 'email': 'a@x.com', 'title': 'CEO'},
+        {'uid': 'b', 'email': 'b@x.com', 'title': 'CTO'},
+        {'uid': 'c', 'email': 'c@x.com', 'title': 'CFO'},
+    ]
+    server_rows = {
+        'a': {'uid': 'a', 'email': 'a@x.com', 'title': 'Founder'},
+        'b': {'uid': 'b', 'email': 'b@x.com', 'title': 'CTO'},
+    }
+    assert changed_records(records, server_rows, 'uid') == [records[0]]
@@ -0,0 +1,33 @@
+# test_sync_state.py
+
+import pandas as pd
+
+from sync_state import WatermarkStore
+
+
+def store(tmp_path, watermark=None):
+    watermarks = WatermarkStore(str(tmp_path / 'sync_state.db'), 'contacts')
+    if watermark is not None:
+        watermarks.latest = pd.Timestamp(watermark)
+        watermarks.commit()
+    return WatermarkStore(str(tmp_path / 'sync_state.db'), 'contacts')
+
+
+def test_filter_newer_keeps_rows_dated_on_the_watermark_day(tmp_path):
+    data = pd.DataFrame({'uid': ['a', 'b', 'c', 'd']})
+    dates = pd.Series(pd.to_datetime(['2024-03-01', '2024-03-02', '2024-03-03', None]))
+    kept = store(tmp_path, '2024-03-02').filter_newer(data, dates)
+    assert kept['uid'].tolist() == ['b', 'c', 'd']
+
+
+def test_filter_newer_full_keeps_everything(tmp_path):
+    data = pd.DataFrame({'uid': ['a', 'b']})
+    dates = pd.Series(pd.to_datetime(['2024-03-01', '2024-03-02']))
+    kept = store(tmp_path, '2024-03-02').filter_newer(data, dates, full=True)
+    assert kept['uid'].tolist() == ['a', 'b']
+
+
+def test_filter_newer_without_watermark_keeps_everything(tmp_path):
+    data = pd.DataFrame({'uid': ['a']})
+    dates = pd.Series(pd.to_datetime(['2024-03-01']))
+    assert store(tmp_path).filter_newer(data, dates)['uid'].tolist() == ['a']
@@ -0,0 +1,27 @@
+# test_upload_executor.py
+
+import pytest
+
+from upload_executor import AdaptiveBatcher
+
+
+def upload_at_most(limit, sent):
+    def upload(records):
+        if len(records) > limit:
+            raise Exception('413 Payload Too Large')
+        sent.append(len(records))
+        return len(records)
+    return upload
+
+
+def test_track_splits_a_failed_batch_and_retries_its_parts():
+    sent = []
+    batcher = AdaptiveBatcher(initial=400, min_size=50)
+    assert batcher.track(upload_at_most(150, sent))(list(range(400))) == 400
+    assert sum(sent) == 400 and max(sent) <= 150
+
+
+def test_track_raises_once_a_part_of_min_size_still_fails():
+    batcher = AdaptiveBatcher(initial=400, min_size=50)
+    with pytest.raises(Exception, match='Payload Too Large'):
+        batcher.track(upload_at_most(10, []))(list(range(400)))
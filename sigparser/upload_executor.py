@@ -0,0 +1,116 @@
+# upload_executor.py
+
+import json
+import operator
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
+
+
+# Errors a smaller request avoids, 413 Payload Too Large and 414 URI Too Long, which are not worth retrying as is
+def too_large(error):
+    status = getattr(error, 'code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return str(status) in ('413', '414') or any(text in str(error) for text in ('Payload Too Large', 'URI Too Long'))
+
+
+class UploadExecutor:
+    def __init__(self, max_workers: int = 4, retries: int = 3, backoff: float = 0.5, report=None):
+        self.max_workers = max(1, max_workers)
+        self.report = report  # Optional RunReport that counts retries
+        self.retries = retries
+        self.backoff = backoff
+
+    # Run a single request, retrying with exponential backoff
+    def call(self, request):
+        for attempt in range(self.retries + 1):
+            try:
+                return request()
+            except Exception as e:
+                if attempt == self.retries or too_large(e):
+                    raise
+                delay = self.backoff * 2 ** attempt
+                if self.report is not None:
+                    self.report.count('retries')
+                print(f"Request failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    # Run task over every item with at most max_workers in flight
+    # Yields (index, item, result, error) in input order so errors are reported in batch order
+    def map(self, task, items):
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        pending = deque()
+        try:
+            for index, item in enumerate(items):
+                pending.append((index, item, pool.submit(task, item)))
+                # Keep a bounded window so batches are only built as workers free up
+                if len(pending) >= self.max_workers * 2:
+                    yield self.result(*pending.popleft())
+            while pending:
+                yield self.result(*pending.popleft())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def result(self, index, item, future):
+        try:
+            return index, item, future.result(), None
+        except Exception as e:
+            return index, item, None, e
+
+
+# Picks the number of records per batch from the serialized size of recent batches and how long they took
+# The size grows while batches come back faster than target_seconds, shrinks when they are slower or fail,
+# and never exceeds max_bytes of JSON or max_size records
+class AdaptiveBatcher:
+    def __init__(self, initial: int = 500, min_size: int = 50, max_size: int = 1000,
+                 max_bytes: int = 1_000_000, target_seconds: float = 2.0, growth: float = 1.25, sample_size: int = 20):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.target_seconds = target_seconds
+        self.growth = growth
+        self.sample_size = sample_size
+        self.size = max(min_size, min(max_size, initial))
+        self.record_bytes = None
+        self.lock = threading.Lock()
+
+    # Wrap an upload task so every batch it handles feeds back into the batch size
+    # A failed batch above min_size is split at the reduced size and its parts retried, the results of the
+    # parts are merged with combine; only a part of min_size records or fewer that still fails raises
+    def track(self, task, combine=operator.add):
+        def tracked(records):
+            start = time.perf_counter()
+            try:
+                result = task(records)
+            except Exception as e:
+                self.failed(records)
+                if len(records) <= self.min_size:
+                    raise
+                size = min(self.size, len(records) // 2)
+                print(f"Batch of {len(records)} records failed ({e}), retrying in parts of {size}")
+                return reduce(combine, (tracked(records[i:i + size]) for i in range(0, len(records), size)))
+            self.observe(records, time.perf_counter() - start)
+            return result
+        return tracked
+
+    def observe(self, records, seconds: float):
+        sample = records[:self.sample_size]
+        record_bytes = len(json.dumps(sample, default=str).encode()) / max(1, len(sample))
+        with self.lock:
+            # Smoothed so one batch of unusually long records doesn't swing the size
+            self.record_bytes = record_bytes if self.record_bytes is None else 0.8 * self.record_bytes + 0.2 * record_bytes
+            if seconds > self.target_seconds:
+                size = min(self.size, len(records) * self.target_seconds / seconds)
+            else:
+                size = max(self.size, len(records)) * self.growth
+            self.resize(size)
+
+    # A failed batch may have hit a request size limit, so halve the size
+    def failed(self, records):
+        with self.lock:
+            self.resize(min(self.size, len(records)) / 2)
+
+    def resize(self, size):
+        limit = self.max_bytes / self.record_bytes if self.record_bytes else self.max_size
+        self.size = int(max(self.min_size, min(self.max_size, limit, size)))